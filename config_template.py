@@ -21,6 +21,8 @@ ACTIVE_MESHTASTIC_CHANNEL_INDEX = 0
 AI_ENABLED = os.environ.get("AI_ENABLED", "true").lower() in ("true", "1", "yes")
 # Set to False to disable bot commands (ping, info, traceroute, !admin)
 BOT_COMMANDS_ENABLED = os.environ.get("BOT_COMMANDS_ENABLED", "true").lower() in ("true", "1", "yes")
+# Set to True to show per-message routing details (AI worker start/skip) in the TUI log
+TUI_DEBUG_LOG = False
 
 # --- AI Settings ---
 DEFAULT_AI_SERVICE = os.environ.get("DEFAULT_AI_SERVICE", "openai")
@@ -30,6 +32,9 @@ AI_RESPONSE_PROBABILITY = 0.85
 AI_MIN_RESPONSE_DELAY_S = 2
 AI_MAX_RESPONSE_DELAY_S = 8
 AI_RESPONSE_COOLDOWN_S = 60
+# Reuse the reply to a prompt the same sender repeats in the same conversation for
+# this many seconds (off unless set; URL and weather/search lookups are never reused)
+# AI_RESPONSE_CACHE_TTL_S = 120
 
 # AI Triage Settings
 ENABLE_AI_TRIAGE_ON_CHANNELS = False
@@ -6,13 +6,9 @@ import random
 from typing import Optional, Callable, Dict, Any
 from dataclasses import dataclass
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime
 
-# Configure logging with a higher level to reduce noise
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Handlers/levels are configured by the entry points (main_app, tui_app.main)
 logger = logging.getLogger('ConnectionManager')
 
 class ConnectionState(Enum):
@@ -45,7 +41,7 @@ class ConnectionStateMachine:
         self._state = ConnectionState.DISCONNECTED
         self._state_lock = threading.Lock()
         self._operation_lock = threading.Lock()  # Lock for operations that should not be concurrent
-        self._last_state_change = datetime.now()
+        self._last_state_change = time.monotonic()
         self._retry_count = 0
         self._last_retry_time = None
         self._connection_check_thread: Optional[threading.Thread] = None
@@ -57,7 +53,7 @@ class ConnectionStateMachine:
         self._on_connection_lost = on_connection_lost
         
         # Connection monitoring
-        self._last_activity = datetime.now()
+        self._last_activity = time.monotonic()
         self._connection_healthy = False
         
         logger.info("ConnectionStateMachine initialized")
@@ -74,7 +70,7 @@ class ConnectionStateMachine:
             old_state = self._state
             if self._is_valid_transition(old_state, new_state):
                 self._state = new_state
-                self._last_state_change = datetime.now()
+                self._last_state_change = time.monotonic()
                 logger.info(f"State transition: {old_state} -> {new_state}")
                 if self._on_state_change:
                     try:
@@ -116,7 +112,7 @@ class ConnectionStateMachine:
                 if self._set_state(ConnectionState.CONNECTED):
                     self._retry_count = 0
                     self._connection_healthy = True
-                    self._last_activity = datetime.now()
+                    self._last_activity = time.monotonic()
                     if self._reconnect_timer:
                         self._reconnect_timer.cancel()
                         self._reconnect_timer = None
@@ -161,7 +157,7 @@ class ConnectionStateMachine:
         if self._reconnect_timer:
             self._reconnect_timer.cancel()
         
-        self._last_retry_time = datetime.now()
+        self._last_retry_time = time.monotonic()
         self._reconnect_timer = threading.Timer(delay, reconnect)
         self._reconnect_timer.daemon = True
         self._reconnect_timer.start()
@@ -208,7 +204,7 @@ class ConnectionStateMachine:
 
     def update_activity(self) -> None:
         """Update last activity timestamp and connection health"""
-        self._last_activity = datetime.now()
+        self._last_activity = time.monotonic()
         self._connection_healthy = True
         logger.debug("Connection activity updated")
 
@@ -233,12 +229,15 @@ class ConnectionStateMachine:
     def get_connection_status(self) -> Dict[str, Any]:
         """Get detailed connection status"""
         with self._state_lock:
+            now_mono, now_wall = time.monotonic(), time.time()
+            since_activity = now_mono - self._last_activity
+            in_state = now_mono - self._last_state_change
             return {
-                "state": self.state.name,
+                "state": self._state.name,  # self.state would re-acquire _state_lock
                 "retry_count": self._retry_count,
-                "last_state_change": self._last_state_change.isoformat(),
-                "last_activity": self._last_activity.isoformat(),
+                "last_state_change": datetime.fromtimestamp(now_wall - in_state).isoformat(),
+                "last_activity": datetime.fromtimestamp(now_wall - since_activity).isoformat(),
                 "connection_healthy": self._connection_healthy,
-                "time_since_last_activity": (datetime.now() - self._last_activity).total_seconds(),
-                "time_in_current_state": (datetime.now() - self._last_state_change).total_seconds()
+                "time_since_last_activity": since_activity,
+                "time_in_current_state": in_state
             } 
\ No newline at end of file
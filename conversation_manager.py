@@ -1,10 +1,25 @@
 # conversation_manager.py
 import json
 import os
+import re
 import time
+import threading
 import traceback
+from collections import deque
+from itertools import islice
+try:
+    import orjson  # optional C JSON codec; reads/writes the same conversation files
+except ImportError:
+    orjson = None
 import meshtastic # Required for meshtastic.BROADCAST_NUM if used in _get_conversation_id logic
 
+# Anchored, case-insensitive match for broadcast destinations ("ffffffff" or "broadcast")
+_is_broadcast_dest = re.compile(rf'(?:{meshtastic.BROADCAST_NUM:x}|broadcast)', re.IGNORECASE).fullmatch
+
+RECENT_MESSAGES_KEPT = 32  # Per-conversation tail kept in memory for get_recent()
+FLUSH_MAX_PENDING = 16     # Write buffered messages once this many are pending...
+FLUSH_INTERVAL_S = 0.5     # ...or at most this long after the first one was buffered
+
 def simple_token_counter(text_content):
     if not isinstance(text_content, str): return 0
     return len(text_content.split()) # Very rough estimate
@@ -14,6 +29,13 @@ class ConversationManager:
         self.config = app_config
         self.ai_bridge = ai_bridge_instance 
         self.storage_path = storage_path
+        self._recent = {}  # conversation_id -> deque of the latest history entries
+        self._counts = {}  # conversation_id -> total messages (on disk + pending); see message_count()
+        # Messages not yet written to disk (conversation_id -> [entries]); see flush()
+        self._pending = {}
+        self._pending_count = 0
+        self._flush_timer = None
+        self._lock = threading.RLock()
         if self.storage_path and not os.path.exists(self.storage_path):
             try:
                 os.makedirs(self.storage_path)
@@ -34,8 +56,7 @@ class ConversationManager:
         is_dm_to_ai = (ai_node_id_hex_str and destination_id_hex_str == ai_node_id_hex_str and sender_id_hex_str != ai_node_id_hex_str)
         is_dm_from_ai_to_user = (ai_node_id_hex_str and sender_id_hex_str == ai_node_id_hex_str and \
                                  destination_id_hex_str and \
-                                 destination_id_hex_str != "broadcast" and \
-                                 destination_id_hex_str != f"{meshtastic.BROADCAST_NUM:x}".lower() and \
+                                 not _is_broadcast_dest(destination_id_hex_str) and \
                                  destination_id_hex_str != ai_node_id_hex_str)
 
         if is_dm_to_ai:
@@ -48,61 +69,252 @@ class ConversationManager:
             return f"ch_{channel_id_str}_broadcast"
         else:
             print(f"Warning: Fallback conversation ID for sender {sender_id_hex_str}, (To: {destination_id_hex_str}, Ch: {channel_id_str}).")
-            if destination_id_hex_str and destination_id_hex_str != "broadcast" and destination_id_hex_str != f"{meshtastic.BROADCAST_NUM:x}".lower():
+            if destination_id_hex_str and not _is_broadcast_dest(destination_id_hex_str):
                 user_ids = sorted([sender_id_hex_str, destination_id_hex_str])
                 return f"dm_other_{user_ids[0]}_{user_ids[1]}"
             return f"unknown_context_sender_{sender_id_hex_str}"
 
 
-    def _get_file_path(self, conversation_id):
+    def _get_file_path(self, conversation_id, ext=".jsonl"):
         if not self.storage_path:
             return None
         safe_conv_id = "".join(c for c in str(conversation_id) if c.isalnum() or c in ('_', '-')).rstrip()
         if not safe_conv_id: safe_conv_id = "unknown_conversation"
-        return os.path.join(self.storage_path, f"{safe_conv_id}.json")
+        return os.path.join(self.storage_path, f"{safe_conv_id}{ext}")
 
     def load_conversation(self, conversation_id):
+        with self._lock:
+            history = self._read_conversation(conversation_id)
+            pending = self._pending.get(conversation_id)
+            if pending:
+                history.extend(pending)
+        return history
+
+    def load_tail(self, conversation_id, k):
+        """Return the last k history entries; only those lines of a .jsonl file are parsed."""
+        with self._lock:
+            file_path = self._get_file_path(conversation_id)
+            if file_path and os.path.exists(file_path):
+                try:
+                    with open(file_path, 'rb') as f:
+                        tail = self._parse_lines(deque(f, maxlen=k), conversation_id)
+                except IOError as e:
+                    print(f"ERROR loading conversation {conversation_id} from {file_path}: {e}")
+                    tail = []
+            else:
+                tail = self._read_conversation(conversation_id)[-k:]
+            pending = self._pending.get(conversation_id)
+            if pending:
+                tail.extend(pending)
+        return tail[-k:]
+
+    @staticmethod
+    def _parse_lines(lines, conversation_id):
+        entries = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                entries.append(orjson.loads(line) if orjson is not None else json.loads(line))
+            except ValueError as e:
+                # A torn last line from an interrupted append; keep the rest
+                print(f"ERROR skipping unreadable line in conversation {conversation_id}: {e}")
+        return entries
+
+    def _read_conversation(self, conversation_id):
         file_path = self._get_file_path(conversation_id)
         if file_path and os.path.exists(file_path):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
+                with open(file_path, 'rb') as f:
+                    return self._parse_lines(f, conversation_id)
+            except IOError as e:
+                print(f"ERROR loading conversation {conversation_id} from {file_path}: {e}")
+            return []
+        # Conversations saved before the switch to JSON Lines
+        legacy_path = self._get_file_path(conversation_id, ext=".json")
+        if legacy_path and os.path.exists(legacy_path):
+            try:
+                if orjson is not None:
+                    with open(legacy_path, 'rb') as f:
+                        return orjson.loads(f.read())
+                with open(legacy_path, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError) as e:
+                print(f"ERROR loading conversation {conversation_id} from {legacy_path}: {e}")
+        return []
+
+    def _count_stored(self, conversation_id):
+        """Number of entries on disk; a .jsonl file is counted by lines without parsing."""
+        file_path = self._get_file_path(conversation_id)
+        if file_path and os.path.exists(file_path):
+            try:
+                count, last = 0, b""
+                with open(file_path, 'rb') as f:
+                    for line in f:
+                        if line.strip():
+                            count += 1
+                            last = line
+                # A torn last line (interrupted append) is skipped by the readers too
+                if last and not last.endswith(b"\n") and not self._parses(last):
+                    count -= 1
+                return count
+            except IOError as e:
                 print(f"ERROR loading conversation {conversation_id} from {file_path}: {e}")
-        return [] 
+                return 0
+        return len(self._read_conversation(conversation_id))
+
+    def get_recent(self, conversation_id, k):
+        """Return the last k history entries (oldest first) without re-reading the file once cached."""
+        recent = self._recent.get(conversation_id)
+        if recent is None:
+            with self._lock:
+                recent = self._recent.get(conversation_id)
+                if recent is None:
+                    recent = self._recent[conversation_id] = deque(
+                        self.load_tail(conversation_id, RECENT_MESSAGES_KEPT), maxlen=RECENT_MESSAGES_KEPT)
+        return list(islice(reversed(recent), k))[::-1]
+
+    def message_count(self, conversation_id):
+        """Number of messages in a conversation; the file is read once, later adds just bump the count."""
+        count = self._counts.get(conversation_id)
+        if count is None:
+            with self._lock:
+                count = self._counts.get(conversation_id)
+                if count is None:
+                    count = self._counts[conversation_id] = (
+                        self._count_stored(conversation_id) + len(self._pending.get(conversation_id, ())))
+        return count
+
+    @staticmethod
+    def _encode_lines(entries):
+        if orjson is not None:
+            return b"".join(orjson.dumps(entry) + b"\n" for entry in entries)
+        return "".join(json.dumps(entry, separators=(',', ':')) + "\n" for entry in entries).encode('utf-8')
 
     def save_conversation(self, conversation_id, history):
+        """Replace the stored conversation with history (one JSON object per line)."""
+        self._counts[conversation_id] = len(history)
+        self._recent[conversation_id] = deque(history[-RECENT_MESSAGES_KEPT:], maxlen=RECENT_MESSAGES_KEPT)
         file_path = self._get_file_path(conversation_id)
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(history, f, indent=2)
+                with open(file_path, 'wb') as f:
+                    f.write(self._encode_lines(history))
             except IOError as e:
                 print(f"ERROR saving conversation {conversation_id} to {file_path}: {e}")
 
+    def append_messages(self, conversation_id, entries):
+        """Append entries to the stored conversation with a single O_APPEND write."""
+        file_path = self._get_file_path(conversation_id)
+        if not file_path:
+            return
+        if not os.path.exists(file_path):
+            legacy_path = self._get_file_path(conversation_id, ext=".json")
+            if os.path.exists(legacy_path):
+                # First write since the format change: convert the old file once and move
+                # it aside so there is only one live copy of the conversation
+                history = self._read_conversation(conversation_id)
+                history.extend(entries)
+                self.save_conversation(conversation_id, history)
+                if os.path.exists(file_path):
+                    try:
+                        os.replace(legacy_path, legacy_path + ".bak")
+                    except OSError as e:
+                        print(f"ERROR moving converted conversation file {legacy_path} aside: {e}")
+                return
+        try:
+            self._repair_tail(file_path)
+            fd = os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, self._encode_lines(entries))
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print(f"ERROR saving conversation {conversation_id} to {file_path}: {e}")
+
+    @staticmethod
+    def _parses(line):
+        try:
+            orjson.loads(line) if orjson is not None else json.loads(line)
+            return True
+        except ValueError:
+            return False
+
+    @classmethod
+    def _repair_tail(cls, file_path, chunk=4096):
+        """Make the file end with a newline before appending: terminate a complete last
+        line, or cut an unreadable one (an interrupted append) that the readers skip anyway."""
+        try:
+            with open(file_path, 'rb+') as f:
+                end = f.seek(0, os.SEEK_END)
+                if not end:
+                    return
+                f.seek(end - 1)
+                if f.read(1) == b"\n":
+                    return
+                pos, tail = end, b""
+                while pos > 0:
+                    start = max(0, pos - chunk)
+                    f.seek(start)
+                    tail = f.read(pos - start) + tail
+                    newline = tail.rfind(b"\n")
+                    if newline != -1:
+                        line_start = start + newline + 1
+                        tail = tail[newline + 1:]
+                        break
+                    pos = start
+                else:
+                    line_start = 0
+                if cls._parses(tail):
+                    f.seek(end)
+                    f.write(b"\n")
+                else:
+                    f.truncate(line_start)
+        except FileNotFoundError:
+            pass
+
+    def _append(self, conversation_id, entry):
+        with self._lock:
+            self._pending.setdefault(conversation_id, []).append(entry)
+            self._pending_count += 1
+            if conversation_id in self._counts:
+                self._counts[conversation_id] += 1
+            recent = self._recent.get(conversation_id)
+            if recent is not None:
+                recent.append(entry)
+            if self._pending_count >= FLUSH_MAX_PENDING:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(FLUSH_INTERVAL_S, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        """Write all buffered messages to disk (one append per conversation)."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending, self._pending, self._pending_count = self._pending, {}, 0
+            for conversation_id, entries in pending.items():
+                self.append_messages(conversation_id, entries)
+
     def add_message(self, conversation_id, role, content, user_name=None, node_id=None):
-        history = self.load_conversation(conversation_id)
         message_entry = {"role": role, "content": content, "timestamp": time.time()}
         if role == "user": 
             if user_name: message_entry["user_name"] = user_name
             if node_id: message_entry["node_id"] = node_id
-        
-        history.append(message_entry)
-        self.save_conversation(conversation_id, history)
-        return history
+        self._append(conversation_id, message_entry)
 
     def add_url_analysis(self, conversation_id, url, analysis_summary):
         """Add URL analysis to conversation history so AI remembers it"""
-        history = self.load_conversation(conversation_id)
         analysis_entry = {
             "role": "system", 
             "content": f"[URL Analysis for {url}: {analysis_summary}]",
             "timestamp": time.time(),
             "url_analysis": True
         }
-        history.append(analysis_entry)
-        self.save_conversation(conversation_id, history)
-        return history
+        self._append(conversation_id, analysis_entry)
 
     def get_contextual_history(self, conversation_id, for_user_name="User"):
         history = self.load_conversation(conversation_id)
@@ -1,47 +1,104 @@
 import json
+import logging
 import time
 from datetime import datetime
 import re
+import threading
+from dataclasses import dataclass
 from typing import Dict, Optional, Tuple
 import random
 
+logger = logging.getLogger('HalBot')
+
+# Commands the bot answers, with or without a leading "bot" prefix
+BOT_COMMANDS = frozenset({'ping', 'traceroute', 'info', 'test', 'qsl'})
+
+
+@dataclass(slots=True)
+class NodeInfo:
+    """Snapshot of a mesh node as reported to bot commands."""
+    node_id: str                  # hex, lowercase, no '!'
+    long_name: str
+    short_name: str
+    hops_away: Optional[int]
+    rssi: Optional[int]
+    snr: Optional[float]
+    last_heard: float
+    battery_level: Optional[int]  # percent
+    connection_type: str          # 'mqtt' or 'radio'
+    uptime: str
+    gateway: str
+
+
+def normalize_command_text(text: str) -> Tuple[str, str]:
+    """Strip an inbound message once and return (stripped, lowercased) forms"""
+    stripped = text.strip()
+    return stripped, stripped.lower()
+
+
 class HalBot:
     def __init__(self, meshtastic_handler, app_config=None):
         self.meshtastic_handler = meshtastic_handler
         self.app_config = app_config
         self.bot_name = getattr(app_config, 'BOT_NAME', 'Eva') if app_config else 'Eva'
-        self.command_pattern = re.compile(r'^(?:bot\s+)?(\w+)(?:\s+(.+))?$', re.IGNORECASE)
         self.admin_pattern = re.compile(r'^!admin\s+(\w+)(?:\s+(.+))?$', re.IGNORECASE)
         self.traceroute_timeout = 30  # seconds
+        self.traceroute_tick = 1.0  # seconds between sweeps of active_traceroutes
         self.pending_traceroutes = {}  # Store pending traceroute requests
         self.active_traceroutes = {}  # Store active traceroute requests
+        self._traceroute_lock = threading.Lock()  # Guards active_traceroutes
+        self._hal_node_num = None  # Node number _hal_node_hex_str was formatted from
+        self._hal_node_hex_str = ""
         self.mqtt_broker = "mqtt.meshtastic.org"  # Default MQTT broker
         self.gateway_info = {}  # Store gateway information for MQTT nodes
         self.admin_node_ids = getattr(app_config, 'ADMIN_NODE_IDS', []) if app_config else []
 
-    def should_handle_message(self, text: str) -> bool:
-        """Check if the message should be handled by the bot"""
-        text_lower = text.lower().strip()
+        # Traceroute replies wake the collector instead of waiting out the timeout
+        if meshtastic_handler is not None:
+            meshtastic_handler.on_traceroute_reply_callback = self.on_traceroute_reply
+
+        # A single collector thread serves every pending traceroute; the wakeup
+        # event lets a reply (or close()) cut the current tick short
+        self._stop_event = threading.Event()
+        self._traceroute_wakeup = threading.Event()
+        self._traceroute_thread = threading.Thread(
+            target=self._traceroute_collector_loop, name="HalBotTraceroute", daemon=True
+        )
+        self._traceroute_thread.start()
+
+    def should_handle_message(self, text: str, text_lower: Optional[str] = None) -> bool:
+        """Check if the message should be handled by the bot.
+
+        Callers that already ran normalize_command_text pass both forms so
+        the message is not stripped/lowercased again.
+        """
+        if text_lower is None:
+            text, text_lower = normalize_command_text(text)
 
         # Admin commands
         if text_lower.startswith("!admin"):
             return True
 
         # Check for direct commands first
-        direct_commands = ['ping', 'traceroute', 'info', 'test', 'qsl']
-        if text_lower in direct_commands:
+        if text_lower in BOT_COMMANDS:
             return True
 
-        # Check for bot prefixed commands
-        return bool(self.command_pattern.match(text))
+        # Cheap word check instead of the command regex: ordinary channel
+        # chatter is rejected here without engaging the regex engine
+        words = text_lower.split(None, 2)
+        if not words:
+            return False
+        if words[0] == 'bot' and len(words) > 1:
+            return words[1] in BOT_COMMANDS
+        return words[0] in BOT_COMMANDS
 
-    def get_node_info(self, node_id: str) -> Dict:
+    def get_node_info(self, node_id: str) -> Optional[NodeInfo]:
         """Get detailed information about a node"""
         if not self.meshtastic_handler or not self.meshtastic_handler.interface:
-            return {}
+            return None
             
         interface = self.meshtastic_handler.interface
-        node_info = {}
+        node_info = None
         
         # Normalize the input node_id
         node_id = node_id.lower().lstrip('!')
@@ -49,92 +106,119 @@ class HalBot:
         # Try to find node in interface
         for node_num, info in interface.nodes.items():
             # Convert node_num to string and normalize
-            if isinstance(node_num, int):
-                node_id_str = f"{node_num:x}"
-            else:
-                node_id_str = str(node_num).lower().lstrip('!')
+            node_id_str = self._normalize_node_key(node_num)
             
-            # Debug print
             # Compare normalized node IDs
-            
             if node_id_str == node_id:
-                # Get user info with fallbacks
-                user_info = info.get('user', {})
-                long_name = user_info.get('longName', 'Unknown')
-                short_name = user_info.get('shortName', 'UNK')
-                
-                # Get connection info
-                connection_type = 'mqtt' if info.get('connectionType') == 'tcp' else 'radio'
-                gateway = info.get('gateway', 'N/A')
-                
-                # Get signal info with fallbacks
-                rssi = info.get('rssi')
-                snr = info.get('snr')
-                if rssi is None and 'lastPacketRssi' in info:
-                    rssi = info['lastPacketRssi']
-                if snr is None and 'lastPacketSnr' in info:
-                    snr = info['lastPacketSnr']
-                
-                hops_away = info.get('hopsAway', None)
-                
-                # Get timing info
-                last_heard = info.get('lastHeard', time.time())
-                uptime = self._format_uptime(info.get('uptime', 0))
-                
-                # Get battery info
-                battery_level = info.get('batteryLevel', None)
-                if battery_level is not None:
-                    battery_level = int(battery_level * 100)  # Convert to percentage
-                
-                node_info = {
-                    'node_id': node_id_str,  # Use the normalized node_id_str
-                    'long_name': long_name,
-                    'short_name': short_name,
-                    'hops_away': hops_away,
-                    'rssi': rssi,
-                    'snr': snr,
-                    'last_heard': last_heard,
-                    'battery_level': battery_level,
-                    'connection_type': connection_type,
-                    'uptime': uptime,
-                    'gateway': gateway
-                }
-                pass  # node found
+                node_info = self._make_node_info(node_id_str, info)
                 break
         
-        if not node_info:
-            pass  # node not found
+        if node_info is None:
+            logger.debug("Node !%s not found in interface.nodes", node_id)
         
         return node_info
 
-    def format_status_response(self, command: str, node_info: Dict) -> str:
+    @property
+    def _hal_node_hex(self) -> str:
+        """Our own node id in hex, re-formatted only when the handler's node id changes"""
+        node_num = self.meshtastic_handler.node_id
+        if node_num != self._hal_node_num:
+            self._hal_node_num = node_num
+            self._hal_node_hex_str = f"{node_num:x}"
+        return self._hal_node_hex_str
+
+    @staticmethod
+    def _normalize_node_key(node_num) -> str:
+        """Normalize an interface.nodes key (int or '!hex' string) to bare lowercase hex"""
+        if isinstance(node_num, int):
+            return f"{node_num:x}"
+        return str(node_num).lower().lstrip('!')
+
+    def _make_node_info(self, node_id_str: str, info: dict) -> NodeInfo:
+        """Build a NodeInfo from a raw interface.nodes record"""
+        # Get user info with fallbacks
+        user_info = info.get('user', {})
+        long_name = user_info.get('longName', 'Unknown')
+        short_name = user_info.get('shortName', 'UNK')
+        
+        # Get connection info
+        connection_type = 'mqtt' if info.get('connectionType') == 'tcp' else 'radio'
+        gateway = info.get('gateway', 'N/A')
+        
+        # Get signal info with fallbacks
+        rssi = info.get('rssi')
+        snr = info.get('snr')
+        if rssi is None and 'lastPacketRssi' in info:
+            rssi = info['lastPacketRssi']
+        if snr is None and 'lastPacketSnr' in info:
+            snr = info['lastPacketSnr']
+        
+        hops_away = info.get('hopsAway', None)
+        
+        # Get timing info
+        last_heard = info.get('lastHeard', time.time())
+        uptime = self._format_uptime(info.get('uptime', 0))
+        
+        # Get battery info
+        battery_level = info.get('batteryLevel', None)
+        if battery_level is not None:
+            battery_level = int(battery_level * 100)  # Convert to percentage
+        
+        return NodeInfo(
+            node_id=node_id_str,  # Use the normalized node_id_str
+            long_name=long_name,
+            short_name=short_name,
+            hops_away=hops_away,
+            rssi=rssi,
+            snr=snr,
+            last_heard=last_heard,
+            battery_level=battery_level,
+            connection_type=connection_type,
+            uptime=uptime,
+            gateway=gateway
+        )
+
+    def _build_node_index(self) -> Dict[str, dict]:
+        """Index interface.nodes by normalized hex id in a single pass.
+
+        Each entry keeps the raw node record plus its parent id, already
+        normalized to hex, so path walks are plain dict lookups.
+        """
+        index = {}
+        for node_num, info in self.meshtastic_handler.interface.nodes.items():
+            parent_id = info.get('parentId')
+            index[self._normalize_node_key(node_num)] = {
+                'info': info,
+                'parent_id': self._normalize_node_key(parent_id) if parent_id else None,
+            }
+        return index
+
+    def format_status_response(self, command: str, node_info: NodeInfo) -> str:
         """Format a professional status response"""
-        status = "OK" if node_info["hops_away"] is not None else "UNKNOWN"
-        rssi_str = f"{node_info['rssi']} dBm" if node_info['rssi'] is not None else "N/A"
-        hops_str = f"{node_info['hops_away']} hop{'s' if node_info['hops_away'] != 1 else ''}" if node_info['hops_away'] is not None else "unknown"
-        mqtt_str = "MQTT connected" if node_info['connection_type'] == 'mqtt' else "LoRa only"
+        status = "OK" if node_info.hops_away is not None else "UNKNOWN"
+        rssi_str = f"{node_info.rssi} dBm" if node_info.rssi is not None else "N/A"
+        hops_str = f"{node_info.hops_away} hop{'s' if node_info.hops_away != 1 else ''}" if node_info.hops_away is not None else "unknown"
+        mqtt_str = "MQTT connected" if node_info.connection_type == 'mqtt' else "LoRa only"
         
-        response = f"{self.bot_name}: {command.upper()} status for node {node_info['node_id']} ({node_info['long_name']}):\n"
+        response = f"{self.bot_name}: {command.upper()} status for node {node_info.node_id} ({node_info.long_name}):\n"
         response += f"• Status: {status}\n"
         response += f"• Signal: {rssi_str}\n"
         response += f"• Distance: {hops_str}\n"
         response += f"• Connection: {mqtt_str}\n"
-        response += f"• Last heard: {self._format_last_heard(node_info['last_heard'])}\n"
+        response += f"• Last heard: {self._format_last_heard(node_info.last_heard)}\n"
         response += f"• Timestamp: {datetime.now().isoformat()}"
         
         return response
 
-    def format_ping_response(self, node_info: dict, is_mqtt: bool = False) -> str:
+    def format_ping_response(self, node_info: NodeInfo, is_mqtt: bool = False) -> str:
         """Format ping response with detailed information"""
-        node_id = node_info.get('node_id', 'unknown')
-        node_name = node_info.get('long_name', 'Unknown')
-        rssi = node_info.get('rssi')
-        snr = node_info.get('snr')
-        hops = node_info.get('hops_away')
-        last_heard = node_info.get('last_heard', 0)
-        battery = node_info.get('battery_level')
-        uptime = node_info.get('uptime', 'N/A')
-        gateway = node_info.get('gateway', 'N/A')
+        node_id = node_info.node_id
+        rssi = node_info.rssi
+        snr = node_info.snr
+        last_heard = node_info.last_heard
+        battery = node_info.battery_level
+        uptime = node_info.uptime
+        gateway = node_info.gateway
         
         # Format signal info
         rssi_str = f"{rssi} dBm" if rssi is not None else "N/A"
@@ -176,7 +260,7 @@ class HalBot:
         if is_mqtt:
             return f"""[TRACEROUTE] MQTT route to !{target_id}:
 
-{self.bot_name} (!{self.meshtastic_handler.node_id:x})
+{self.bot_name} (!{self._hal_node_hex})
 ↳ MQTT Broker: {self.mqtt_broker}
 ↳ !{target_id} (subscribed) ✅
 🌐 Path type: MQTT-direct
@@ -230,11 +314,12 @@ class HalBot:
         
         return None
 
-    def handle_command(self, text: str, sender_id: str, sender_name: str, channel_id: int = None, is_dm: bool = False) -> Optional[dict]:
+    def handle_command(self, text: str, sender_id: str, sender_name: str, channel_id: int = None, is_dm: bool = False,
+                       text_lower: Optional[str] = None) -> Optional[dict]:
         """Handle bot commands"""
-        # Clean up the text and check for direct commands
-        text = text.strip()
-        text_lower = text.lower()
+        # Clean up the text unless the caller already normalized it
+        if text_lower is None:
+            text, text_lower = normalize_command_text(text)
 
         # Normalize sender_id
         sender_id = sender_id.lower().lstrip('!')
@@ -244,39 +329,41 @@ class HalBot:
             return self._handle_admin(text, sender_id, sender_name, channel_id)
 
         # Handle direct commands without bot prefix
-        if text_lower in ['ping', 'traceroute', 'info', 'test', 'qsl']:
+        if text_lower in BOT_COMMANDS:
             command = text_lower
             args = ""
         else:
-            # Handle bot prefixed commands
-            match = self.command_pattern.match(text)
-            if not match:
+            # Handle "[bot] <command> [args]" with plain splits
+            parts = text.split(None, 1)
+            if len(parts) > 1 and parts[0].lower() == 'bot':
+                parts = parts[1].split(None, 1)
+            if not parts:
                 return None
-            command = match.group(1).lower()
-            args = match.group(2) if match.group(2) else ""
+            command = parts[0].lower()
+            args = parts[1] if len(parts) > 1 else ""
 
         if command in ['info', 'test', 'ping', 'qsl']:
             # Get node info
             node_info = self.get_node_info(sender_id)
             if not node_info:
                 # If node info not found, try to get basic info from the sender
-                node_info = {
-                    'node_id': sender_id,
-                    'long_name': sender_name,
-                    'short_name': sender_name[:3].upper() if len(sender_name) >= 3 else 'UNK',
-                    'hops_away': None,
-                    'rssi': None,
-                    'snr': None,
-                    'last_heard': time.time(),
-                    'battery_level': None,
-                    'connection_type': 'radio',  # Default to radio if unknown
-                    'uptime': 'N/A',
-                    'gateway': 'N/A'
-                }
-                pass  # using fallback info
+                node_info = NodeInfo(
+                    node_id=sender_id,
+                    long_name=sender_name,
+                    short_name=sender_name[:3].upper() if len(sender_name) >= 3 else 'UNK',
+                    hops_away=None,
+                    rssi=None,
+                    snr=None,
+                    last_heard=time.time(),
+                    battery_level=None,
+                    connection_type='radio',  # Default to radio if unknown
+                    uptime='N/A',
+                    gateway='N/A'
+                )
+                logger.debug("Using fallback node info for !%s", sender_id)
             
             # Check if node is connected via MQTT
-            is_mqtt = node_info.get('connection_type') == 'mqtt'
+            is_mqtt = node_info.connection_type == 'mqtt'
             
             # Format response based on command
             response_text = None
@@ -317,13 +404,6 @@ class HalBot:
                             'is_channel_message': channel_id is not None
                         }
             
-            if target_id in self.active_traceroutes:
-                return {
-                    'response': f"{self.bot_name}: Traceroute already in progress for this node",
-                    'channel_id': channel_id,
-                    'is_channel_message': channel_id is not None
-                }
-            
             # Get target node info
             target_info = self.get_node_info(target_id)
             if not target_info:
@@ -334,20 +414,32 @@ class HalBot:
                 }
             
             # Check if target is connected via MQTT
-            is_mqtt = target_info.get('connection_type') == 'mqtt'
+            is_mqtt = target_info.connection_type == 'mqtt'
             
-            # Store traceroute request with requester info
-            self.active_traceroutes[target_id] = {
-                'start_time': time.time(),
-                'target_info': target_info,
-                'is_mqtt': is_mqtt,
-                'requester_id': sender_id,  # Store who requested the traceroute
-                'requester_name': sender_name,
-                'channel_id': channel_id  # Store the channel ID for the response
-            }
+            # Store traceroute request with requester info (check-and-insert under
+            # the lock so two concurrent requests can't both start a collector)
+            with self._traceroute_lock:
+                already_active = target_id in self.active_traceroutes
+                if not already_active:
+                    self.active_traceroutes[target_id] = {
+                        'start_time': time.monotonic(),
+                        'target_info': target_info,
+                        'is_mqtt': is_mqtt,
+                        'requester_id': sender_id,  # Store who requested the traceroute
+                        'requester_name': sender_name,
+                        'channel_id': channel_id  # Store the channel ID for the response
+                    }
+            if already_active:
+                return {
+                    'response': f"{self.bot_name}: Traceroute already in progress for this node",
+                    'channel_id': channel_id,
+                    'is_channel_message': channel_id is not None
+                }
             
-            # Start background collection
-            self._start_traceroute_collection(target_id)
+            # Probe the target over the mesh (queued behind pending sends, not awaited);
+            # the collector finalizes on reply or timeout
+            if not is_mqtt and self.meshtastic_handler.is_connected:
+                self.meshtastic_handler.send_traceroute(target_id, channel_index=channel_id or 0)
             
             # Customize response based on whether we're using default target
             if not args:
@@ -361,41 +453,67 @@ class HalBot:
                 'is_channel_message': channel_id is not None
             }
 
-    def _start_traceroute_collection(self, target_id: str) -> None:
-        """Start background traceroute collection"""
-        def collect_traceroute():
-            time.sleep(self.traceroute_timeout)
-            if target_id in self.active_traceroutes:
-                traceroute_data = self.active_traceroutes[target_id]
-                path_info = self._get_traceroute_info(target_id)
-                is_mqtt = traceroute_data['is_mqtt']
-                response = self.format_traceroute_response(path_info, is_mqtt)
-                
-                # Send response back to the requester (not the target)
-                if self.meshtastic_handler and self.meshtastic_handler.is_connected:
-                    # Use the stored channel_id if this was a channel message
-                    channel_id = traceroute_data.get('channel_id')
-                    if channel_id is not None:
-                        # Send to channel
-                        self.meshtastic_handler.send_message(
-                            response,
-                            channel_index=channel_id
-                        )
-                    else:
-                        # Send as DM
-                        self.meshtastic_handler.send_message(
-                            response,
-                            destination_id_hex=traceroute_data['requester_id']
-                        )
-                
-                # Clean up
-                del self.active_traceroutes[target_id]
+    def _traceroute_collector_loop(self) -> None:
+        """Sweep active_traceroutes once per tick and finalize expired entries"""
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            with self._traceroute_lock:
+                expired = [tid for tid, td in self.active_traceroutes.items()
+                           if 'reply_time' in td or now - td['start_time'] >= self.traceroute_timeout]
+            for target_id in expired:
+                try:
+                    self._finalize_traceroute(target_id)
+                except Exception as e:
+                    logger.error("Traceroute to !%s failed: %s", target_id, e)
+            self._traceroute_wakeup.wait(self.traceroute_tick)
+            self._traceroute_wakeup.clear()
+
+    def on_traceroute_reply(self, sender_id_hex: str, decoded_packet: dict) -> None:
+        """Mark a pending traceroute as answered and wake the collector"""
+        target_id = sender_id_hex.lower().lstrip('!')
+        with self._traceroute_lock:
+            traceroute_data = self.active_traceroutes.get(target_id)
+            if traceroute_data is None or 'reply_time' in traceroute_data:
+                return
+            traceroute_data['reply_time'] = time.monotonic()
+        self._traceroute_wakeup.set()
+
+    def _finalize_traceroute(self, target_id: str) -> None:
+        """Build the traceroute result for target_id and send it to the requester"""
+        # Claim the entry atomically so a duplicate finalize is a no-op
+        with self._traceroute_lock:
+            traceroute_data = self.active_traceroutes.pop(target_id, None)
+        if traceroute_data is None:
+            return
+
+        path_info = self._get_traceroute_info(target_id)
+        if 'reply_time' in traceroute_data:
+            # Real round-trip time instead of the estimate
+            path_info['latency'] = int((traceroute_data['reply_time'] - traceroute_data['start_time']) * 1000)
+        is_mqtt = traceroute_data['is_mqtt']
+        response = self.format_traceroute_response(path_info, is_mqtt)
         
-        # Start collection in a separate thread
-        import threading
-        thread = threading.Thread(target=collect_traceroute)
-        thread.daemon = True
-        thread.start()
+        # Send response back to the requester (not the target)
+        if self.meshtastic_handler and self.meshtastic_handler.is_connected:
+            # Use the stored channel_id if this was a channel message
+            channel_id = traceroute_data.get('channel_id')
+            if channel_id is not None:
+                # Send to channel
+                self.meshtastic_handler.send_message(
+                    response,
+                    channel_index=channel_id
+                )
+            else:
+                # Send as DM
+                self.meshtastic_handler.send_message(
+                    response,
+                    destination_id_hex=traceroute_data['requester_id']
+                )
+
+    def close(self) -> None:
+        """Stop the traceroute collector thread"""
+        self._stop_event.set()
+        self._traceroute_wakeup.set()
 
     def _get_traceroute_info(self, target_id: str) -> dict:
         """Get traceroute information for a target node"""
@@ -410,10 +528,13 @@ class HalBot:
             'latency': random.randint(100, 1000)  # Simplified latency calculation
         }
         
+        # Index the node table once; the hop walk below is then O(hops)
+        node_index = self._build_node_index() if interface.nodes else {}
+        
         # Get target node info
-        target_info = self.get_node_info(target_id)
-        if target_info:
-            path_info['target_name'] = target_info.get('long_name', 'Unknown')
+        target_record = node_index.get(target_id)
+        if target_record:
+            path_info['target_name'] = target_record['info'].get('user', {}).get('longName', 'Unknown')
         
         # Build path based on node's parent nodes
         current_id = target_id
@@ -425,32 +546,25 @@ class HalBot:
                 break
                 
             visited.add(current_id)
-            node_info = self.get_node_info(current_id)
-            if node_info:
-                path_info['hops'].insert(0, {
-                    'node_id': current_id,
-                    'node_name': node_info.get('long_name', 'Unknown'),
-                    'rssi': node_info.get('rssi', 'N/A'),
-                    'snr': node_info.get('snr', 'N/A')
-                })
-                
-                # Try to get parent node
-                if interface.nodes:
-                    for node_num, info in interface.nodes.items():
-                        if str(node_num).lower() == current_id.lower():
-                            parent_id = info.get('parentId')
-                            if parent_id:
-                                current_id = f"{parent_id:x}" if isinstance(parent_id, int) else str(parent_id)
-                            else:
-                                current_id = None
-                            break
-            else:
+            node_record = node_index.get(current_id)
+            if not node_record:
                 break
+            node_info = self._make_node_info(current_id, node_record['info'])
+            path_info['hops'].insert(0, {
+                'node_id': current_id,
+                'node_name': node_info.long_name,
+                'rssi': node_info.rssi,
+                'snr': node_info.snr
+            })
+            
+            # Follow the parent node
+            current_id = node_record['parent_id']
         
         # Add bot node as the first hop if not already present
-        if not path_info['hops'] or path_info['hops'][0]['node_id'] != f"{self.meshtastic_handler.node_id:x}":
+        hal = self._hal_node_hex
+        if not path_info['hops'] or path_info['hops'][0]['node_id'] != hal:
             path_info['hops'].insert(0, {
-                'node_id': f"{self.meshtastic_handler.node_id:x}",
+                'node_id': hal,
                 'node_name': self.bot_name,
                 'rssi': 'N/A',
                 'snr': 'N/A'
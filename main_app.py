@@ -9,48 +9,128 @@ import re
 import argparse 
 import asyncio 
 import random 
-from collections import deque
+import atexit
+import queue
 import logging
+import logging.handlers
+from concurrent.futures import ThreadPoolExecutor
 from tui_app import main as tui_main
 from hal_bot import HalBot
 
 # --- Initial Setup & Debug Function ---
 print_debug = True 
 
+class _RingLog:
+    """Fixed-size ring of recent log lines; writers take the lock."""
+    __slots__ = ("buf", "i", "lock")
+
+    def __init__(self, size):
+        self.buf = [None] * size
+        self.i = 0
+        self.lock = threading.Lock()
+
+    def push(self, msg):
+        with self.lock:
+            self.buf[self.i] = msg
+            self.i = (self.i + 1) % len(self.buf)
+
+
 # Global log buffer for interactive mode
-interactive_log_buffer = deque(maxlen=50)  # Keep last 50 log entries
+interactive_log_buffer = _RingLog(50)  # Keep last 50 log entries
 
 LOG_FILE_PATH = "interactive.backend.log"
-logging.basicConfig(    
-    filename=LOG_FILE_PATH,
-    filemode='a',
-    format='%(asctime)s %(levelname)s: %(message)s',
-    level=logging.DEBUG
+LOG_FLUSH_INTERVAL_S = 0.2  # Max time a record may sit in the file buffer
+
+
+class _BatchedFileHandler(logging.FileHandler):
+    """FileHandler that flushes at most every LOG_FLUSH_INTERVAL_S (always on WARNING+).
+
+    A record that isn't flushed right away arms a one-shot timer, so the tail
+    of the log reaches the file even when no further records arrive.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_flush = 0.0
+        self._force_flush = False
+        self._flush_timer = None
+
+    def emit(self, record):
+        self._force_flush = record.levelno >= logging.WARNING
+        super().emit(record)
+
+    def flush(self):
+        now = time.monotonic()
+        if self._force_flush or now - self._last_flush >= LOG_FLUSH_INTERVAL_S:
+            self._last_flush = now
+            super().flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(LOG_FLUSH_INTERVAL_S, self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self):
+        with self.lock:
+            self._flush_timer = None
+            self._last_flush = time.monotonic()
+            super().flush()
+
+    def close(self):
+        self._force_flush = True
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        super().close()
+
+
+# Callers only enqueue; a background QueueListener thread does the file I/O
+_log_file_handler = _BatchedFileHandler(LOG_FILE_PATH, mode='a', delay=True)
+_log_file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(message)s'))
+_log_queue = queue.Queue()
+# force=True: importing tui_app above may already have configured the root logger
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(message)s',  # QueueHandler only merges args; the file handler adds the prefix
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
+    force=True
 )
-
-def dprint(message: str):
-    if print_debug:
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+def _short(text, width=100):
+    """Truncate text for console output; returns the original object when it already fits."""
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+# Echo debug lines to the console only when someone is watching it
+_stdout_is_tty = sys.stdout.isatty()
+
+def dprint(message: str, *args):
+    """Debug output with lazy %-style args, e.g. dprint("conv=%s", conv_id); free when print_debug is off."""
+    if not print_debug:
+        return
+    if args:
+        message = message % args
+    line = f"DEBUG: {message}"
+    # Also add to interactive log buffer
+    interactive_log_buffer.push(line)
+    logging.debug(message)
+    if _stdout_is_tty:
         try:
-            print(f"DEBUG: {message}")
-            # Also add to interactive log buffer
-            interactive_log_buffer.append(f"DEBUG: {message}")
-            logging.debug(message)
+            print(line)
         except UnicodeEncodeError:
-            fallback_msg = f"DEBUG (ascii-fallback): {message.encode('ascii', 'replace').decode('ascii')}"
-            print(fallback_msg)
-            interactive_log_buffer.append(fallback_msg)
-            logging.debug(fallback_msg)
+            print(f"DEBUG (ascii-fallback): {message.encode('ascii', 'replace').decode('ascii')}")
 
 def log_info(message: str):
     """Log info messages that should appear in both console and interactive logs"""
     print(f"INFO: {message}")
-    interactive_log_buffer.append(f"INFO: {message}")
+    interactive_log_buffer.push(f"INFO: {message}")
     logging.info(message)
 
 def log_error(message: str):
     """Log error messages that should appear in both console and interactive logs"""
     print(f"ERROR: {message}")
-    interactive_log_buffer.append(f"ERROR: {message}")
+    interactive_log_buffer.push(f"ERROR: {message}")
     logging.error(message)
 
 dprint("main_app.py - Script execution started (Top of file).")
@@ -64,7 +144,7 @@ try:
         sys.stderr.reconfigure(encoding='utf-8', errors='replace')
         dprint("main_app.py - Attempted to reconfigure stdout/stderr for UTF-8.")
 except Exception as e_reconfig:
-    dprint(f"main_app.py - Could not reconfigure stdout/stderr for UTF-8: {e_reconfig}")
+    dprint("main_app.py - Could not reconfigure stdout/stderr for UTF-8: %s", e_reconfig)
 
 # --- CRITICAL CONFIG IMPORT ---
 config = None 
@@ -76,8 +156,8 @@ try:
         dprint("CRITICAL ERROR: 'config' module is None after import. This indicates a severe import issue.")
         exit(1)
     test_attr = config.DEFAULT_AI_SERVICE 
-    dprint(f"main_app.py - Successfully imported 'config' and accessed DEFAULT_AI_SERVICE: '{test_attr}'")
-    dprint(f"Is 'config' in globals now? {'config' in globals()}")
+    dprint("main_app.py - Successfully imported 'config' and accessed DEFAULT_AI_SERVICE: '%s'", test_attr)
+    dprint("Is 'config' in globals now? %s", 'config' in globals())
 except ImportError:
     print("ERROR: config.py not found! Please copy config_template.py to config.py and fill it out properly.")
     traceback.print_exc()
@@ -97,6 +177,7 @@ except Exception as e_config:
     exit(1)
 dprint("main_app.py - Config import block successfully passed.")
 
+import meshtastic_handler
 from meshtastic_handler import MeshtasticHandler
 from ai_bridge import AIBridge
 from conversation_manager import ConversationManager
@@ -107,7 +188,7 @@ from message_router import MessageRouter, RouteResult
 # #############################################################################
 class MeshtasticAIAppConsole:
     def __init__(self, attempt_number=1):
-        dprint(f"MeshtasticAIAppConsole.__init__ - Initializing (Attempt {attempt_number})...")
+        dprint("MeshtasticAIAppConsole.__init__ - Initializing (Attempt %s)...", attempt_number)
         self.app_config = config
         self.ai_bridge = AIBridge(self.app_config)
         self.conversation_manager = ConversationManager(self.app_config, self.ai_bridge)
@@ -118,6 +199,13 @@ class MeshtasticAIAppConsole:
         self._stop_event = threading.Event()
         self.reconnection_monitor_thread = None
         self.is_actively_reconnecting = False
+        # AI replies run off the Meshtastic receive thread; one lock per conversation keeps them ordered
+        self._ai_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="AIReply")
+        self._conversation_locks = {}
+        self._conversation_locks_guard = threading.Lock()
+        # Outbound messages are queued as (text, destination_id_hex, channel_index) and sent in batches
+        self._tx_queue = queue.Queue()
+        self._tx_thread = None
 
         try:
             dprint("MeshtasticAIAppConsole.__init__ - Initializing Meshtastic Handler...")
@@ -128,19 +216,15 @@ class MeshtasticAIAppConsole:
             )
 
             # Wait for connection with timeout
-            connect_wait_retries = 5
-            initial_connection_confirmed = False
-            while connect_wait_retries > 0:
-                try:
-                    if self.meshtastic_handler and self.meshtastic_handler.is_connected:
-                        initial_connection_confirmed = True
-                        break
-                    time.sleep(1)
-                    connect_wait_retries -= 1
-                except KeyboardInterrupt:
-                    if self.meshtastic_handler:
-                        self.meshtastic_handler.close()
-                    raise KeyboardInterrupt("Connection attempt cancelled by user")
+            try:
+                initial_connection_confirmed = (
+                    self.meshtastic_handler._connected_event.wait(timeout=7.0)
+                    and self.meshtastic_handler.is_connected
+                )
+            except KeyboardInterrupt:
+                if self.meshtastic_handler:
+                    self.meshtastic_handler.close()
+                raise KeyboardInterrupt("Connection attempt cancelled by user")
 
             if not initial_connection_confirmed:
                 if self.meshtastic_handler:
@@ -149,7 +233,7 @@ class MeshtasticAIAppConsole:
 
             if self.meshtastic_handler.node_id is not None:
                 self.ai_node_id_hex = f"{self.meshtastic_handler.node_id:x}"
-                dprint(f"MeshtasticAIAppConsole.__init__ - Handler connected. AI Node ID: {self.ai_node_id_hex}")
+                dprint("MeshtasticAIAppConsole.__init__ - Handler connected. AI Node ID: %s", self.ai_node_id_hex)
             else:
                 if self.meshtastic_handler:
                     self.meshtastic_handler.close()
@@ -162,6 +246,8 @@ class MeshtasticAIAppConsole:
                 self.conversation_manager, self.hal_bot,
                 self.meshtastic_handler
             )
+            self._tx_thread = threading.Thread(target=self._tx_sender_loop, name="MeshtasticTx", daemon=True)
+            self._tx_thread.start()
             dprint("MeshtasticAIAppConsole.__init__ - Initialization complete.")
 
         except KeyboardInterrupt:
@@ -175,7 +261,7 @@ class MeshtasticAIAppConsole:
 
     def handle_meshtastic_message(self, text, sender_id, sender_name, destination_id, channel_id):
         """Incoming message handler - delegates to MessageRouter."""
-        print(f"\n[RX CONSOLE] From: {sender_name} ({sender_id}) | To: {destination_id} | Ch: {channel_id} | Msg: \"{text[:100]}\"")
+        print(f"\n[RX CONSOLE] From: {sender_name} ({sender_id}) | To: {destination_id} | Ch: {channel_id} | Msg: \"{_short(text)}\"")
 
         result = self.router.on_message(
             text, sender_id, sender_name, destination_id,
@@ -189,130 +275,196 @@ class MeshtasticAIAppConsole:
         # --- Broadcast SOS alert on all channels ---
         if result.broadcast_alert:
             for ch in result.broadcast_channels:
-                success, reason = self.meshtastic_handler.send_message(
-                    result.broadcast_alert, channel_index=ch
-                )
-                if not success:
-                    print(f"ERROR: Failed to broadcast alert on ch {ch}: {reason}")
-            log_info(f"SOS alert broadcast on {len(result.broadcast_channels)} channel(s)")
+                self._tx_queue.put((result.broadcast_alert, None, ch))
+            log_info(f"SOS alert queued for {len(result.broadcast_channels)} channel(s)")
 
         # --- Send direct reply (HAL bot, help confirmation, etc.) ---
         if result.reply_text and result.handled:
-            if result.reply_as_dm:
-                success, reason = self.meshtastic_handler.send_message(
-                    result.reply_text, destination_id_hex=result.reply_destination, channel_index=0
-                )
-            else:
-                success, reason = self.meshtastic_handler.send_message(
-                    result.reply_text, channel_index=result.reply_channel
-                )
-            if not success:
-                print(f"ERROR: Failed to send reply: {reason}")
+            self._queue_reply(result, result.reply_text)
             return
 
         # --- AI response needed ---
         if result.needs_ai_response:
-            dprint(f"Generating AI response for {sender_name} in {result.conversation_id}...")
+            try:
+                self._ai_executor.submit(self._process_ai_reply, result, text, sender_name, sender_id)
+            except RuntimeError:
+                dprint("AI executor already shut down; dropping AI reply.")
+
+    def _conversation_lock(self, conversation_id):
+        with self._conversation_locks_guard:
+            lock = self._conversation_locks.get(conversation_id)
+            if lock is None:
+                lock = self._conversation_locks[conversation_id] = threading.Lock()
+            return lock
+
+    def _process_ai_reply(self, result, text, sender_name, sender_id):
+        """Generate and send an AI reply (runs on the AI executor)."""
+        with self._conversation_lock(result.conversation_id):
+            if self._stop_event.is_set():
+                return
+            dprint("Generating AI response for %s in %s...", sender_name, result.conversation_id)
             ai_response = self.router.generate_ai_response(
                 result.conversation_id, text, sender_name, sender_id,
                 is_dm=result.reply_as_dm, skip_triage=result.skip_triage
             )
-            if ai_response and ai_response.strip():
-                self.router.apply_human_delay()
-                self.router.record_response(result.conversation_id, ai_response)
-                log_info(f"AI sent reply to {sender_name}")
-                print(f"[AI CONSOLE -> {sender_name}] {ai_response[:100]}")
-                if result.reply_as_dm:
-                    success, reason = self.meshtastic_handler.send_message(
-                        ai_response, destination_id_hex=result.reply_destination, channel_index=0
-                    )
-                else:
-                    success, reason = self.meshtastic_handler.send_message(
-                        ai_response, channel_index=result.reply_channel
-                    )
-                if not success:
-                    print(f"ERROR: Failed to send AI reply: {reason}")
-            else:
+            if not (ai_response and ai_response.strip()):
                 print(f"INFO: No valid AI response for {sender_name}.")
+                return
+            if self.router.apply_human_delay(stop_event=self._stop_event):
+                return
+            if not self.meshtastic_handler or not self.meshtastic_handler.is_connected:
+                print("ERROR: Meshtastic disconnected. Dropping AI reply.")
+                return
+            self.router.record_response(result.conversation_id, ai_response)
+            log_info(f"AI sent reply to {sender_name}")
+            print(f"[AI CONSOLE -> {sender_name}] {_short(ai_response)}")
+            self._queue_reply(result, ai_response)
+
+    def _queue_reply(self, result, text):
+        if result.reply_as_dm:
+            self._tx_queue.put((text, result.reply_destination, 0))
+        else:
+            self._tx_queue.put((text, None, result.reply_channel))
+
+    def _tx_sender_loop(self, max_batch=8):
+        """Drain the outbound queue, handing up to *max_batch* messages to the handler at once."""
+        while not self._stop_event.is_set():
+            try:
+                batch = [self._tx_queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while len(batch) < max_batch:
+                try:
+                    batch.append(self._tx_queue.get_nowait())
+                except queue.Empty:
+                    break
+            handler = self.meshtastic_handler
+            if not handler or not handler.is_connected:
+                print(f"ERROR: Meshtastic disconnected. Dropping {len(batch)} outbound message(s).")
+                continue
+            for (text, dest, ch), (success, reason) in zip(batch, handler.send_batch(batch)):
+                if not success:
+                    print(f"ERROR: Failed to send message (to: {dest or f'ch {ch}'}): {reason}")
 
     def run_console_ui(self):
         print("\n--- Meshtastic AI Bridge Console (CLI Mode) ---")
         if not self.meshtastic_handler or not self.meshtastic_handler.is_connected: print("WARNING: Meshtastic not connected at UI start.")
         print("Type 'quit' to exit, 'help' for commands.")
+        commands = {
+            "quit": self._cmd_quit,
+            "help": self._cmd_help,
+            "send": self._cmd_send,
+            "dm": self._cmd_dm,
+            "persona": self._cmd_persona,
+            "use_ai": self._cmd_use_ai,
+            "active_channel": self._cmd_active_channel,
+            "list_channels": self._cmd_list_channels,
+            "token_limit": self._cmd_token_limit,
+            "status": self._cmd_status,
+        }
         while not self._stop_event.is_set():
             try:
                 if self.meshtastic_handler and not self.meshtastic_handler.is_connected and not self.is_actively_reconnecting: print("\nWARNING: Meshtastic connection lost. Reconnection attempts in background.")
                 cmd_input = input("CMD> ").strip()
                 if not cmd_input: continue
-                if cmd_input.lower() == 'quit': print("Exiting application..."); self._stop_event.set(); break
-                elif cmd_input.lower() == 'help': 
-                    print("\nCommands:")
-                    print("  send <message>          - Send message as AI to active channel")
-                    print("  dm <node_id_hex> <msg>  - Send direct message as AI")
-                    print("  persona <text>          - Set AI persona")
-                    print("  use_ai <openai|gemini>  - Switch AI service")
-                    print("  active_channel <idx>    - Set active Meshtastic channel for AI's own posts")
-                    print("  list_channels           - List available Meshtastic channels")
-                    print("  token_limit <num>       - Set summarization token trigger")
-                    print("  status                  - Show current status")
-                    print("  quit                    - Exit the application\n")
-                elif cmd_input.startswith("send "):
-                    if not self.meshtastic_handler or not self.meshtastic_handler.is_connected: print("ERROR: Meshtastic not connected."); continue
-                    msg = cmd_input[len("send "):].strip();
-                    if msg:
-                        success, reason = self.meshtastic_handler.send_message(f"{msg}", channel_index=self.active_channel_for_ai_posts)
-                        if not success:
-                            print(f"ERROR: Failed to send message: {reason}")
-                    else:
-                        print("Usage: send <message>")
-                elif cmd_input.startswith("dm "):
-                    if not self.meshtastic_handler or not self.meshtastic_handler.is_connected: print("ERROR: Meshtastic not connected."); continue
-                    parts = cmd_input.split(" ", 2); node_id_hex, msg = (parts[1], parts[2].strip()) if len(parts) == 3 else (None,None)
-                    if node_id_hex and msg:
-                        success, reason = self.meshtastic_handler.send_message(f"{msg}", destination_id_hex=node_id_hex)
-                        if not success:
-                            print(f"ERROR: Failed to send DM: {reason}")
-                    else: print("Usage: dm <node_id_hex> <message>")
-                elif cmd_input.startswith("persona "):
-                    persona_text = cmd_input[len("persona "):].strip(); self.ai_bridge.set_persona(persona_text) if persona_text else print("Persona text empty.")
-                elif cmd_input.startswith("use_ai "): self.ai_bridge.set_ai_service(cmd_input[len("use_ai "):].strip().lower())
-                elif cmd_input.startswith("active_channel "):
-                    try: self.active_channel_for_ai_posts = int(cmd_input[len("active_channel "):].strip())
-                    except ValueError: print("Invalid channel index.")
-                elif cmd_input.lower() == "list_channels":
-                    if not self.meshtastic_handler or not self.meshtastic_handler.is_connected: print("ERROR: Meshtastic not connected."); continue
-                    self.meshtastic_handler.list_channels() 
-                elif cmd_input.startswith("token_limit "):
-                    try: limit = int(cmd_input[len("token_limit "):].strip()); self.app_config.SUMMARIZE_THRESHOLD_TOKENS = limit if limit > 50 else print("Token limit too low.")
-                    except ValueError: print("Invalid token limit.")
-                elif cmd_input.lower() == "status":
-                    print("\n--- Status ---")
-                    print(f"  AI Service: {self.ai_bridge.current_ai_service if self.ai_bridge else 'N/A'}")
-                    persona_display = 'N/A'; text_persona = self.ai_bridge.current_persona if self.ai_bridge else None
-                    if text_persona: persona_display = text_persona[:97] + "..." if len(text_persona) > 100 else text_persona
-                    print(f"  AI Persona: {persona_display}")
-                    print(f"  AI Node ID: {self.ai_node_id_hex or 'N/A'}")
-                    print(f"  AI Active Channel: {self.active_channel_for_ai_posts}")
-                    print(f"  Summarize Threshold: {self.app_config.SUMMARIZE_THRESHOLD_TOKENS}")
-                    print(f"  AI Response Prob: {self.ai_response_probability*100:.0f}%")
-                    print(f"  AI Response Delay: {self.ai_min_delay}-{self.ai_max_delay}s")
-                    print(f"  AI Response Cooldown: {self.ai_cooldown}s")
-                    print(f"  AI Triage on Channels: {self.enable_ai_triage}")
-                    mh_status = "No Handler"; handler_is_connected = self.meshtastic_handler.is_connected if self.meshtastic_handler else False
-                    if self.meshtastic_handler: mh_status = "Connected" if handler_is_connected else "Disconnected"
-                    print(f"  Meshtastic Status: {mh_status}")
-                    if self.is_actively_reconnecting: print("  Reconnection in progress...")
-                    print("---------------\n")
+                cmd, _, args = cmd_input.partition(" ")
+                handler = commands.get(cmd.lower())
+                if handler: handler(args.strip())
                 else: print("Unknown command. Type 'help'.")
             except KeyboardInterrupt: print("\nCtrl+C detected. Type 'quit' to exit.")
             except EOFError: print("\nEOF. Exiting."); self._stop_event.set(); break
             except Exception as e_ui: print(f"ERROR in console UI: {e_ui}"); traceback.print_exc()
         print("Console UI loop ended."); print("Console UI initiated shutdown sequence.")
 
+    # --- Console commands (each receives the stripped argument string) ---
+    def _require_connection(self):
+        if not self.meshtastic_handler or not self.meshtastic_handler.is_connected:
+            print("ERROR: Meshtastic not connected.")
+            return False
+        return True
+
+    def _cmd_quit(self, args):
+        print("Exiting application..."); self._stop_event.set()
+
+    def _cmd_help(self, args):
+        print("\nCommands:")
+        print("  send <message>          - Send message as AI to active channel")
+        print("  dm <node_id_hex> <msg>  - Send direct message as AI")
+        print("  persona <text>          - Set AI persona")
+        print("  use_ai <openai|gemini>  - Switch AI service")
+        print("  active_channel <idx>    - Set active Meshtastic channel for AI's own posts")
+        print("  list_channels           - List available Meshtastic channels")
+        print("  token_limit <num>       - Set summarization token trigger")
+        print("  status                  - Show current status")
+        print("  quit                    - Exit the application\n")
+
+    def _cmd_send(self, msg):
+        if not self._require_connection(): return
+        if not msg: print("Usage: send <message>"); return
+        success, reason = self.meshtastic_handler.send_message(msg, channel_index=self.active_channel_for_ai_posts)
+        if not success:
+            print(f"ERROR: Failed to send message: {reason}")
+
+    def _cmd_dm(self, args):
+        if not self._require_connection(): return
+        node_id_hex, _, msg = args.partition(" ")
+        msg = msg.strip()
+        if not (node_id_hex and msg): print("Usage: dm <node_id_hex> <message>"); return
+        success, reason = self.meshtastic_handler.send_message(msg, destination_id_hex=node_id_hex)
+        if not success:
+            print(f"ERROR: Failed to send DM: {reason}")
+
+    def _cmd_persona(self, persona_text):
+        if persona_text: self.ai_bridge.set_persona(persona_text)
+        else: print("Persona text empty.")
+
+    def _cmd_use_ai(self, service):
+        self.ai_bridge.set_ai_service(service.lower())
+
+    def _cmd_active_channel(self, args):
+        try: self.active_channel_for_ai_posts = int(args)
+        except ValueError: print("Invalid channel index.")
+
+    def _cmd_list_channels(self, args):
+        if not self._require_connection(): return
+        self.meshtastic_handler.list_channels()
+
+    def _cmd_token_limit(self, args):
+        try: limit = int(args)
+        except ValueError: print("Invalid token limit."); return
+        if limit > 50: self.app_config.SUMMARIZE_THRESHOLD_TOKENS = limit
+        else: print("Token limit too low.")
+
+    def _cmd_status(self, args):
+        router = self.router
+        text_persona = self.ai_bridge.current_persona if self.ai_bridge else None
+        if self.meshtastic_handler: mh_status = "Connected" if self.meshtastic_handler.is_connected else "Disconnected"
+        else: mh_status = "No Handler"
+        lines = [
+            "\n--- Status ---",
+            f"  AI Service: {self.ai_bridge.current_ai_service if self.ai_bridge else 'N/A'}",
+            f"  AI Persona: {_short(text_persona) if text_persona else 'N/A'}",
+            f"  AI Node ID: {self.ai_node_id_hex or 'N/A'}",
+            f"  AI Active Channel: {self.active_channel_for_ai_posts}",
+            f"  Summarize Threshold: {self.app_config.SUMMARIZE_THRESHOLD_TOKENS}",
+            f"  AI Response Prob: {router.ai_response_probability*100:.0f}%",
+            f"  AI Response Delay: {router.ai_min_delay}-{router.ai_max_delay}s",
+            f"  AI Response Cooldown: {router.ai_cooldown}s",
+            f"  AI Triage on Channels: {router.enable_ai_triage}",
+            f"  Meshtastic Status: {mh_status}",
+        ]
+        if self.is_actively_reconnecting: lines.append("  Reconnection in progress...")
+        lines.append("---------------\n")
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
     def close_app(self):
         dprint("MeshtasticAIAppConsole.close_app() called.")
         self._stop_event.set()
+        self._ai_executor.shutdown(wait=False, cancel_futures=True)
+        if getattr(self, 'hal_bot', None): self.hal_bot.close()
         if self.meshtastic_handler: self.meshtastic_handler.close()
+        self.conversation_manager.flush()
         if self.reconnection_monitor_thread and self.reconnection_monitor_thread.is_alive():
             dprint("Waiting for console reconnection monitor thread to join...")
             self.reconnection_monitor_thread.join(timeout=2.0) 
@@ -344,14 +496,14 @@ def try_create_cli_app_instance(attempt_num):
 def cli_connection_monitor_loop(app_instance_ref_list, stop_event_ref):
     dprint("CLI Connection monitor thread started.")
     app_config_local = config 
+    monitor_interval = getattr(app_config_local, 'MONITOR_CONNECTION_INTERVAL', 30)
+    max_retries = getattr(app_config_local, 'RECONNECTION_MAX_RETRIES', 3)
+    retry_delay = getattr(app_config_local, 'RECONNECTION_RETRY_DELAY', 10)
     while not stop_event_ref.is_set():
-        for _ in range(getattr(app_config_local, 'MONITOR_CONNECTION_INTERVAL', 30)):
-            if stop_event_ref.is_set(): break
-            time.sleep(1)
-        if stop_event_ref.is_set(): break
+        if stop_event_ref.wait(timeout=monitor_interval): break
         if not app_instance_ref_list or app_instance_ref_list[0] is None: 
             dprint("CLI Monitor: App instance is None.")
-            time.sleep(5)
+            if stop_event_ref.wait(timeout=5): break
             continue
         app = app_instance_ref_list[0]
         if not app or not hasattr(app, 'meshtastic_handler'): 
@@ -367,31 +519,25 @@ def cli_connection_monitor_loop(app_instance_ref_list, stop_event_ref):
                     app.meshtastic_handler = None
                     app.ai_node_id_hex = None
                 reconnect_attempts = 0
-                max_retries = getattr(app_config_local, 'RECONNECTION_MAX_RETRIES', 3)
-                retry_delay = getattr(app_config_local, 'RECONNECTION_RETRY_DELAY', 10)
                 while reconnect_attempts < max_retries and not stop_event_ref.is_set():
                     reconnect_attempts += 1
-                    dprint(f"CLI Monitor: Reconnection attempt {reconnect_attempts}/{max_retries}...")
+                    dprint("CLI Monitor: Reconnection attempt %s/%s...", reconnect_attempts, max_retries)
                     try:
                         app.meshtastic_handler = MeshtasticHandler( 
                             connection_type=app.app_config.MESHTASTIC_CONNECTION_TYPE, 
                             device_specifier=app.app_config.MESHTASTIC_DEVICE_SPECIFIER, 
                             on_message_received_callback=app.handle_meshtastic_message 
                         )
-                        connect_wait_retries = 7
-                        reconnected_successfully = False
-                        while connect_wait_retries > 0:
-                            if app.meshtastic_handler.is_connected: 
-                                reconnected_successfully = True
-                                break
-                            time.sleep(1)
-                            connect_wait_retries -= 1
+                        reconnected_successfully = (
+                            app.meshtastic_handler._connected_event.wait(timeout=7.0)
+                            and app.meshtastic_handler.is_connected
+                        )
                         if reconnected_successfully and app.meshtastic_handler.node_id is not None: 
                             app.ai_node_id_hex = f"{app.meshtastic_handler.node_id:x}"
                             print(f"INFO: CLI Monitor: Reconnection successful! AI Node ID: {app.ai_node_id_hex}")
                             break 
                         else: 
-                            dprint(f"CLI Monitor: Reconn attempt {reconnect_attempts} - handler status uncertain.")
+                            dprint("CLI Monitor: Reconn attempt %s - handler status uncertain.", reconnect_attempts)
                             if app.meshtastic_handler: app.meshtastic_handler.close()
                             app.meshtastic_handler = None 
                     except Exception as e_recon: 
@@ -399,11 +545,8 @@ def cli_connection_monitor_loop(app_instance_ref_list, stop_event_ref):
                         if app.meshtastic_handler: app.meshtastic_handler.close()
                         app.meshtastic_handler = None 
                     if reconnect_attempts < max_retries and not stop_event_ref.is_set():
-                        dprint(f"CLI Monitor: Waiting {retry_delay}s before next attempt.")
-                        for _ in range(retry_delay): 
-                            if stop_event_ref.is_set(): break
-                            time.sleep(1)
-                    if stop_event_ref.is_set(): break 
+                        dprint("CLI Monitor: Waiting %ss before next attempt.", retry_delay)
+                        if stop_event_ref.wait(timeout=retry_delay): break
                 if not (app.meshtastic_handler and app.meshtastic_handler.is_connected): 
                     print("ERROR: CLI Monitor: Failed to reconnect.")
                 app.is_actively_reconnecting = False
@@ -426,7 +569,8 @@ if __name__ == "__main__":
 
     if cmd_args.no_debug_prints: print_debug = False
     if cmd_args.debug: print_debug = True
-    dprint(f"main_app.py - Parsed cmd args: {cmd_args}")
+    meshtastic_handler._DEBUG_TB = cmd_args.debug
+    dprint("main_app.py - Parsed cmd args: %s", cmd_args)
     
     if cmd_args.interactive:
         dprint("Starting Interactive TUI mode...")
@@ -473,7 +617,7 @@ if __name__ == "__main__":
                 break
             elif attempt < max_attempts:
                 print(f"\nRetrying console mode (attempt {attempt + 1}/{max_attempts})...")
-                time.sleep(2)  # Wait before retrying
+                time.sleep(min(1.5 ** attempt, 8.0))  # Back off before retrying, capped at 8s
             else:
                 print("\nERROR: Failed to start console mode after multiple attempts.")
                 sys.exit(1)
@@ -2,30 +2,139 @@ import meshtastic
 import meshtastic.serial_interface
 import meshtastic.tcp_interface
 import meshtastic.util
-from meshtastic import mesh_pb2
+from meshtastic import mesh_pb2, portnums_pb2
 from meshtastic.mesh_interface import MeshInterface
 from pubsub import pub
+import atexit
+import logging
+import logging.handlers
+import itertools
+import queue
+import re
+import sys
 import time
 import traceback
 import threading
-from datetime import datetime
-from typing import Tuple, Optional
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Tuple, Optional, List, Iterable
 from connection_manager import ConnectionStateMachine, ConnectionConfig, ConnectionState
 
+logger = logging.getLogger('MeshtasticHandler')
+
+_BROADCAST_NUM = meshtastic.BROADCAST_NUM
+_BROADCAST_HEX = f"{_BROADCAST_NUM:x}"
+
+# ASCII bytes that are neither printable nor whitespace (same rule as str.isprintable/isspace)
+_BAD_CTRL = bytes(b for b in range(128) if not (chr(b).isprintable() or chr(b).isspace()))
+
+# Portnums _on_receive_internal acts on. The library's decoded dict only carries the enum
+# name, so one dict lookup per packet maps it to a small int used for all later checks.
+_PORT_TEXT, _PORT_PRIVATE, _PORT_TRACEROUTE, _PORT_NODEINFO, _PORT_ADMIN = range(5)
+_PORT_KINDS = {
+    'TEXT_MESSAGE_APP': _PORT_TEXT,
+    'PRIVATE_APP': _PORT_PRIVATE,
+    'TRACEROUTE_APP': _PORT_TRACEROUTE,
+    'NODEINFO_APP': _PORT_NODEINFO,
+    'ADMIN_APP': _PORT_ADMIN,
+}
+
+# Node ids as sent by callers: bare hex, no "!" or "0x" prefix
+_is_hex_id = re.compile(r'[0-9a-fA-F]+').fullmatch
+
+# Channel role enum value -> name, so list_channels skips protobuf enum reflection
+_ROLE_NAMES = ({value: name for name, value in mesh_pb2.Channel.Role.items()}
+               if hasattr(mesh_pb2, 'Channel') else {})
+
+# Log full tracebacks for send failures (main_app turns this on with --debug)
+_DEBUG_TB = False
+
+def _node_num(iface):
+    """Return iface.myInfo.my_node_num, or None while node info isn't available."""
+    my_info = getattr(iface, 'myInfo', None)
+    return getattr(my_info, 'my_node_num', None) if my_info is not None else None
+
+# Console output for log_info/log_error/dprint. Callback threads only enqueue the record;
+# the listener thread does the stdout write, so packet dispatch never waits on the stdout lock.
+class _CurrentStdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time (Textual swaps it while the TUI runs)."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """Starts the console listener thread with the first record instead of at import."""
+
+    def enqueue(self, record):
+        if not _console_started:
+            _start_console_listener()
+        super().enqueue(record)
+
+
+def _start_console_listener():
+    global _console_started
+    with _console_start_lock:
+        if not _console_started:
+            _console_listener.start()
+            atexit.register(_console_listener.stop)
+            _console_started = True
+
+
+_console_log = logging.getLogger('MeshtasticHandler.console')
+_console_log.setLevel(logging.DEBUG)
+_console_log.propagate = False  # stdout only, as with the former print() calls
+_console_queue = queue.SimpleQueue()
+_console_log.addHandler(_LazyQueueHandler(_console_queue))
+_console_stream = _CurrentStdoutHandler()
+_console_stream.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+_console_listener = logging.handlers.QueueListener(_console_queue, _console_stream)
+_console_started = False
+_console_start_lock = threading.Lock()
+
 def log_info(msg):
-    print(f"INFO: {msg}")
+    _console_log.info(msg)
+def log_warning(msg):
+    _console_log.warning(msg)
 def log_error(msg):
-    print(f"ERROR: {msg}")
+    _console_log.error(msg)
 def dprint(msg):
-    print(f"DEBUG: {msg}")
+    _console_log.debug(msg)
 
 class MeshtasticHandler:
     def __init__(self, connection_type="serial", device_specifier=None, on_message_received_callback=None):
         self.on_message_received_callback = on_message_received_callback
+        self.on_traceroute_reply_callback = None  # Called as (sender_id_hex, decoded_packet)
         self.interface = None
         self.node_id = None
         self._connection_type = connection_type
         self._device_specifier = device_specifier
+        # Set while the state machine is CONNECTED so callers can wait instead of polling
+        self._connected_event = threading.Event()
+        # Outbound packets: (text, utf-8 payload, destination_id_hex, channel_index, Future) drained by _tx_worker
+        self._tx_q = queue.Queue()
+        self._tx_stop = threading.Event()
+        self._tx_lock = threading.Lock()  # orders enqueues against close() so no Future is left pending
+        self._tx_thread = None
+        self._tx_seq = itertools.count(1)  # numbers send attempts in the log
+        # sender node num -> (display name, hex id); dropped when the node sends NODEINFO_APP
+        self._name_cache = {}
+        # Recently seen (sender, packet id) pairs, to drop duplicate deliveries
+        self._seen_ids = deque(maxlen=256)
+        self._seen_set = set()
+        # list_channels() result; rebuilt after (re)connect or an ADMIN_APP packet
+        self._channels_cache = None
+        self._channels_dirty = True
+        self._closed = False
+        # Receive-callback failures (exception, packet, sender label), formatted by _err_drain
+        self._err_q = queue.Queue(maxsize=64)
+        threading.Thread(target=self._err_drain, name="MeshtasticRxErrors", daemon=True).start()
 
         # Initialize connection state machine
         self._conn_sm = ConnectionStateMachine(
@@ -39,9 +148,11 @@ class MeshtasticHandler:
             on_state_change=self._on_state_change,
         )
 
-        print(f"Attempting Meshtastic connection: type='{connection_type}', specifier='{device_specifier or 'auto-detect'}'")
+        log_info(f"Attempting Meshtastic connection: type='{connection_type}', specifier='{device_specifier or 'auto-detect'}'")
         self._conn_sm.start_connection()
         self._do_connect()
+        self._tx_thread = threading.Thread(target=self._tx_worker, name="MeshtasticTxWorker", daemon=True)
+        self._tx_thread.start()
 
     @property
     def is_connected(self) -> bool:
@@ -56,6 +167,10 @@ class MeshtasticHandler:
     def _on_state_change(self, old_state: ConnectionState, new_state: ConnectionState):
         """React to state machine transitions."""
         log_info(f"Connection state: {old_state.name} -> {new_state.name}")
+        if new_state == ConnectionState.CONNECTED:
+            self._connected_event.set()
+        else:
+            self._connected_event.clear()
         if new_state == ConnectionState.CONNECTING and old_state in {ConnectionState.RECONNECTING, ConnectionState.FAILED}:
             # State machine scheduled a reconnect — attempt it in a background thread
             threading.Thread(target=self._do_reconnect, daemon=True).start()
@@ -84,15 +199,15 @@ class MeshtasticHandler:
             else:
                 raise ValueError(f"Unsupported connection_type: {self._connection_type}")
         except KeyboardInterrupt:
-            print("\nConnection attempt interrupted by user")
+            log_info("Connection attempt interrupted by user")
             if self.interface:
                 try: self.interface.close()
                 except: pass
             raise
         except Exception as e:
-            print(f"Error initializing Meshtastic interface object: {e}")
+            log_error(f"Error initializing Meshtastic interface object: {e}")
             if self._connection_type == "serial" and self._device_specifier is None:
-                print("Attempted auto-detect for serial. If a device is connected, try specifying its path directly.")
+                log_error("Attempted auto-detect for serial. If a device is connected, try specifying its path directly.")
             if isinstance(e, (MeshInterface.MeshInterfaceError, ConnectionRefusedError, TimeoutError, OSError, TypeError)):
                 self._conn_sm.connection_failed(e)
                 raise ConnectionError(f"Failed to create Meshtastic interface object: {e}") from e
@@ -103,69 +218,94 @@ class MeshtasticHandler:
             self._conn_sm.connection_failed(Exception("Interface is None"))
             raise ConnectionError("Meshtastic interface object could not be established (is None after init attempt).")
 
-        # Try to get node info with timeout
-        retries = 5
-        while retries > 0 and (not hasattr(self.interface, 'myInfo') or self.interface.myInfo is None or \
-                             not hasattr(self.interface.myInfo, 'my_node_num')):
-            try:
-                print(f"Waiting for Meshtastic interface to get myInfo (node details)... ({retries} retries left)")
-                time.sleep(1.0)
-                if hasattr(self.interface, '_readFromRadio'):
-                    try: self.interface._readFromRadio()
-                    except: pass
-                retries -= 1
-            except KeyboardInterrupt:
-                if self.interface:
-                    try: self.interface.close()
-                    except: pass
-                raise KeyboardInterrupt("Connection attempt interrupted by user")
-
-        if not hasattr(self.interface, 'myInfo') or self.interface.myInfo is None or \
-           not hasattr(self.interface.myInfo, 'my_node_num'):
+        try:
+            node_num = self._wait_for_node_num(timeout=5.0)
+        except KeyboardInterrupt:
+            if self.interface:
+                try: self.interface.close()
+                except: pass
+            raise KeyboardInterrupt("Connection attempt interrupted by user")
+
+        if node_num is None:
             if self.interface:
                 try: self.interface.close()
                 except: pass
             self._conn_sm.connection_failed(Exception("No myInfo from device"))
             raise ConnectionError("Failed to get valid node info (myInfo.my_node_num) from Meshtastic device.")
 
-        self.node_id = self.interface.myInfo.my_node_num
+        self.node_id = node_num
+
+        log_info(f"Meshtastic interface initialized. Attempting to confirm connection status...")
+
+        self._subscribe_events()
 
-        print(f"Meshtastic interface initialized. Attempting to confirm connection status...")
+        # Confirm without sleeping: isConnected is already set once the config handshake finished
+        # (serial waited on it above; TCPInterface blocks in its constructor). Otherwise the
+        # 'established' subscription above finishes the transition.
+        is_connected_evt = getattr(self.interface, 'isConnected', None)
+        if is_connected_evt is not None and is_connected_evt.is_set():
+            self._conn_sm.connection_succeeded()
+            log_info(f"Meshtastic connected. Node ID: {self.node_id:x}")
+            if hasattr(self.interface.myInfo, 'long_name') and hasattr(self.interface.myInfo, 'short_name'):
+                log_info(f"Node Name: {self.interface.myInfo.long_name} ({self.interface.myInfo.short_name})")
+        elif self.node_id is not None:
+            self._conn_sm.connection_succeeded()
+            log_info(f"Meshtastic Node ID {self.node_id:x} retrieved. Waiting for 'established' event.")
 
+    def _subscribe_events(self):
+        """Register packet and connection callbacks for the current interface."""
+        # MeshInterface has no per-interface receive-callback list; the only non-pubsub hook,
+        # meshtastic.protocols[portnum].onReceive, is process-global and already used by the
+        # library itself, so pubsub stays the registration point.
         pub.subscribe(self._on_receive_internal, "meshtastic.receive")
         pub.subscribe(self._on_connection_established, "meshtastic.connection.established")
         pub.subscribe(self._on_connection_lost, "meshtastic.connection.lost")
 
-        # Wait briefly for connection confirmation
+    def _unsubscribe_events(self):
         try:
-            time.sleep(0.5)
-            if self.interface and hasattr(self.interface, 'isConnected') and self.interface.isConnected:
-                self._conn_sm.connection_succeeded()
-                print(f"Meshtastic connected. Node ID: {self.node_id:x}")
-                if hasattr(self.interface.myInfo, 'long_name') and hasattr(self.interface.myInfo, 'short_name'):
-                    print(f"Node Name: {self.interface.myInfo.long_name} ({self.interface.myInfo.short_name})")
-            elif self.interface and self.node_id is not None:
-                self._conn_sm.connection_succeeded()
-                print(f"Meshtastic Node ID {self.node_id:x} retrieved. Waiting for 'established' event.")
-        except KeyboardInterrupt:
-            if self.interface:
-                try: self.interface.close()
-                except: pass
-            raise KeyboardInterrupt("Connection attempt interrupted by user")
+            pub.unsubscribe(self._on_receive_internal, "meshtastic.receive")
+            pub.unsubscribe(self._on_connection_established, "meshtastic.connection.established")
+            pub.unsubscribe(self._on_connection_lost, "meshtastic.connection.lost")
+        except Exception as e_unsub:
+            log_warning(f"Error during pubsub unsubscribe: {e_unsub}")
+
+    def _wait_for_node_num(self, timeout: float) -> Optional[int]:
+        """Wait up to timeout for myInfo; the library publishes 'established' once it is populated."""
+        node_num = _node_num(self.interface)
+        if node_num is not None:
+            return node_num
+        my_info_ready = threading.Event()
+
+        def _on_ready(interface):
+            if _node_num(self.interface) is not None:
+                my_info_ready.set()
+
+        pub.subscribe(_on_ready, "meshtastic.connection.established")
+        try:
+            log_info("Waiting for Meshtastic interface to get myInfo (node details)...")
+            if _node_num(self.interface) is None:
+                my_info_ready.wait(timeout=timeout)
+        finally:
+            pub.unsubscribe(_on_ready, "meshtastic.connection.established")
+        return _node_num(self.interface)
 
     def _on_connection_established(self, interface):
-        print(f"Meshtastic Connection Event: Established (Interface: {interface})")
+        if self._closed: return
+        log_info(f"Meshtastic Connection Event: Established (Interface: {interface})")
         self._conn_sm.connection_succeeded()
-        if self.interface and hasattr(self.interface, 'myInfo') and self.interface.myInfo and hasattr(self.interface.myInfo, 'my_node_num'):
-             self.node_id = self.interface.myInfo.my_node_num
-             print(f"Connection established. AI Node ID confirmed: {self.node_id:x}")
+        self._channels_dirty = True
+        node_num = _node_num(self.interface)
+        if node_num is not None:
+             self.node_id = node_num
+             log_info(f"Connection established. AI Node ID confirmed: {self.node_id:x}")
         else:
-             print("Warning: myInfo not fully available on 'connection established' event.")
+             log_warning("myInfo not fully available on 'connection established' event.")
 
     def _on_connection_lost(self, interface):
-        print(f"Meshtastic Connection Event: Lost (Interface: {interface})")
+        if self._closed: return
+        log_info(f"Meshtastic Connection Event: Lost (Interface: {interface})")
         self._conn_sm.connection_failed(Exception("Connection lost event from Meshtastic"))
-        print("Meshtastic connection lost. State machine will handle reconnection.")
+        log_info("Meshtastic connection lost. State machine will handle reconnection.")
 
     def _do_reconnect(self):
         """Background reconnection attempt triggered by the state machine."""
@@ -173,12 +313,7 @@ class MeshtasticHandler:
         try:
             # Close old interface
             if self.interface:
-                try:
-                    pub.unsubscribe(self._on_receive_internal, "meshtastic.receive")
-                    pub.unsubscribe(self._on_connection_established, "meshtastic.connection.established")
-                    pub.unsubscribe(self._on_connection_lost, "meshtastic.connection.lost")
-                except Exception:
-                    pass
+                self._unsubscribe_events()
                 try:
                     self.interface.close()
                 except Exception:
@@ -199,19 +334,13 @@ class MeshtasticHandler:
 
             if not self.interface:
                 raise ConnectionError("Interface is None after reconnect")
+            self._channels_dirty = True
 
-            # Wait for myInfo
-            for _ in range(5):
-                if hasattr(self.interface, 'myInfo') and self.interface.myInfo and hasattr(self.interface.myInfo, 'my_node_num'):
-                    break
-                time.sleep(1.0)
-
-            if hasattr(self.interface, 'myInfo') and self.interface.myInfo and hasattr(self.interface.myInfo, 'my_node_num'):
-                self.node_id = self.interface.myInfo.my_node_num
+            node_num = self._wait_for_node_num(timeout=5.0)
+            if node_num is not None:
+                self.node_id = node_num
 
-            pub.subscribe(self._on_receive_internal, "meshtastic.receive")
-            pub.subscribe(self._on_connection_established, "meshtastic.connection.established")
-            pub.subscribe(self._on_connection_lost, "meshtastic.connection.lost")
+            self._subscribe_events()
 
             self._conn_sm.connection_succeeded()
             log_info(f"Reconnection successful. Node ID: {self.node_id:x}")
@@ -221,7 +350,7 @@ class MeshtasticHandler:
             self._conn_sm.connection_failed(e)
 
     def _on_receive_internal(self, packet, interface):
-        if not packet: return
+        if not packet or self._closed: return
         # Update state machine activity on every received packet
         self._conn_sm.update_activity()
         sender_id_hex = ""
@@ -229,51 +358,66 @@ class MeshtasticHandler:
         try:
             sender_id_num = packet.get('from')
             if sender_id_num is None: return
+            decoded_packet = packet.get('decoded')
+            port_kind = _PORT_KINDS.get(decoded_packet.get('portnum')) if decoded_packet else None
+            if port_kind == _PORT_ADMIN:
+                self._channels_dirty = True  # admin replies (also our own node's) may change channels
             if self.node_id is not None and sender_id_num == self.node_id: return
+            packet_id = packet.get('id')
+            if packet_id:
+                seen_key = (sender_id_num, packet_id)
+                if seen_key in self._seen_set: return
+                if len(self._seen_ids) == self._seen_ids.maxlen:
+                    self._seen_set.discard(self._seen_ids[0])
+                self._seen_ids.append(seen_key)
+                self._seen_set.add(seen_key)
+
+            # Position, telemetry, encrypted etc. packets need nothing beyond the activity update
+            if port_kind is None or port_kind == _PORT_ADMIN:
+                return
+            if port_kind == _PORT_NODEINFO:
+                self._name_cache.pop(sender_id_num, None)  # re-resolved on the node's next message
+                return
+
+            cached = self._name_cache.get(sender_id_num)
+            if cached is not None:
+                user_name_to_use, sender_id_hex = cached
+            else:
+                sender_id_hex, user_name_to_use = self._resolve_sender_name(sender_id_num, interface)
 
-            sender_id_hex = f"{sender_id_num:x}"
-            user_name_to_use = f"Node-{sender_id_hex}" 
-
-            if interface and hasattr(interface, 'nodes') and interface.nodes:
-                # Try int key first, then string "!hex" key
-                node_info = interface.nodes.get(sender_id_num)
-                if node_info is None:
-                    node_info = interface.nodes.get(f"!{sender_id_hex}")
-                if node_info and 'user' in node_info and node_info['user']:
-                    user_data = node_info['user']
-                    short_name_val = user_data.get('shortName')
-                    long_name_val = user_data.get('longName')
-
-                    s_name = str(short_name_val).strip() if short_name_val is not None else ""
-                    l_name = str(long_name_val).strip() if long_name_val is not None else ""
-
-                    if s_name and l_name and s_name != l_name:
-                        user_name_to_use = f"{s_name}/{l_name}"
-                    elif l_name:
-                        user_name_to_use = l_name
-                    elif s_name:
-                        user_name_to_use = s_name
-            
-            decoded_packet = packet.get('decoded')
             if decoded_packet:
                 message_text = None
-                portnum_string = decoded_packet.get('portnum') 
 
-                if portnum_string == 'TEXT_MESSAGE_APP': 
+                if port_kind == _PORT_TRACEROUTE:
+                    if self.on_traceroute_reply_callback:
+                        self.on_traceroute_reply_callback(sender_id_hex, decoded_packet)
+                    return
+
+                if port_kind == _PORT_TEXT: 
                     message_text = decoded_packet.get('text')
-                elif portnum_string == 'PRIVATE_APP': 
-                    if 'payload' in decoded_packet:
-                        try:
-                            message_text = decoded_packet['payload'].decode('utf-8', errors='strict')
-                            if not (message_text and all(c.isprintable() or c.isspace() for c in message_text)):
+                elif port_kind == _PORT_PRIVATE: 
+                    raw = decoded_packet.get('payload')
+                    if raw:
+                        if raw.isascii():
+                            # Fast path: reject control bytes in C before decoding
+                            if len(raw.translate(None, _BAD_CTRL)) == len(raw):
+                                message_text = raw.decode('ascii')
+                        else:
+                            try:
+                                message_text = raw.decode('utf-8', errors='strict')
+                                if not all(c.isprintable() or c.isspace() for c in message_text):
+                                    message_text = None 
+                            except UnicodeDecodeError:
                                 message_text = None 
-                        except UnicodeDecodeError:
-                            message_text = None 
                 
                 if message_text is not None:
                     channel_id_from_packet_field = packet.get('channel')
                     destination_id_num = packet.get('to')
-                    destination_id_hex = f"{destination_id_num:x}" if destination_id_num is not None else f"{meshtastic.BROADCAST_NUM:x}"
+                    # Most traffic is broadcast; only DMs need their destination formatted
+                    if destination_id_num is None or destination_id_num == _BROADCAST_NUM:
+                        destination_id_hex = _BROADCAST_HEX
+                    else:
+                        destination_id_hex = f"{destination_id_num:x}"
                     channel_id = channel_id_from_packet_field
 
                     if self.on_message_received_callback:
@@ -285,90 +429,236 @@ class MeshtasticHandler:
                             channel_id=channel_id
                         )
         except Exception as e:
-            error_user_context = user_name_to_use if user_name_to_use else sender_id_hex
-            print(f"ERROR in _on_receive_internal (From: {error_user_context}). Packet: {packet}. Error: {e}")
-            traceback.print_exc()
+            # Hand off to _err_drain; under an error flood the excess is dropped rather than
+            # stalling packet dispatch on traceback formatting
+            try:
+                self._err_q.put_nowait((e, packet, user_name_to_use or sender_id_hex))
+            except queue.Full:
+                pass
+
+    def _err_drain(self):
+        """Log receive-callback failures queued by _on_receive_internal."""
+        while True:
+            item = self._err_q.get()
+            if item is None:
+                return
+            e, packet, error_user_context = item
+            log_error(f"_on_receive_internal failed (From: {error_user_context}). Packet: {packet}. Error: {e}\n"
+                      + "".join(traceback.format_exception(type(e), e, e.__traceback__)).rstrip())
+
+    def _resolve_sender_name(self, sender_id_num, interface) -> Tuple[str, str]:
+        """Return (sender_id_hex, display name), caching it once the node's user info is known."""
+        sender_id_hex = f"{sender_id_num:x}"
+        user_name_to_use = f"Node-{sender_id_hex}"
+
+        if interface and hasattr(interface, 'nodes') and interface.nodes:
+            # Try int key first, then string "!hex" key
+            node_info = interface.nodes.get(sender_id_num)
+            if node_info is None:
+                node_info = interface.nodes.get(f"!{sender_id_hex}")
+            if node_info and 'user' in node_info and node_info['user']:
+                user_data = node_info['user']
+                short_name_val = user_data.get('shortName')
+                long_name_val = user_data.get('longName')
+
+                s_name = str(short_name_val).strip() if short_name_val is not None else ""
+                l_name = str(long_name_val).strip() if long_name_val is not None else ""
+
+                if s_name and l_name and s_name != l_name:
+                    user_name_to_use = f"{s_name}/{l_name}"
+                elif l_name:
+                    user_name_to_use = l_name
+                elif s_name:
+                    user_name_to_use = s_name
+                # Unknown nodes keep the Node-<hex> fallback uncached so a later nodes-DB update is seen
+                self._name_cache[sender_id_num] = (user_name_to_use, sender_id_hex)
+        return sender_id_hex, user_name_to_use
 
     def send_message(self, text: str, destination_id_hex: str = None, channel_index: int = None) -> Tuple[bool, str]:
-        """Send a message to a specific node or channel"""
+        """Send a message to a specific node or channel (blocks until the TX worker has sent it)"""
+        return self.send_message_async(text, destination_id_hex, channel_index).result()
+
+    def send_message_async(self, text: str, destination_id_hex: str = None, channel_index: int = None) -> Future:
+        """Queue a message for the TX worker; the Future resolves to send_message's (success, reason)."""
+        # Encoded once here; _send_message_now hands the bytes straight to sendData
+        payload = text.encode('utf-8')
+        return self._submit_tx(partial(self._send_message_now, text, destination_id_hex, channel_index, payload),
+                               len(payload), (False, "not_connected"))
+
+    def _submit_tx(self, job: Callable[[], Any], nbytes: int, not_running_result) -> Future:
+        """Queue a zero-argument send job for the TX worker; the Future resolves to its return value.
+
+        Every sendData call goes through here so sends never interleave.
+        """
+        future = Future()
+        with self._tx_lock:
+            if self._tx_thread is None or self._tx_stop.is_set():
+                future.set_result(not_running_result)
+            else:
+                self._tx_q.put((job, nbytes, not_running_result, future))
+        return future
+
+    def send_messages_batch(self, messages: Iterable[Tuple[str, Optional[str], Optional[int]]]) -> List[Future]:
+        """Queue several (text, destination_id_hex, channel_index) messages at once."""
+        return [self.send_message_async(text, dest, ch) for text, dest, ch in messages]
+
+    def _tx_worker(self, max_messages=8, max_bytes=1024):
+        """Send queued messages back to back, up to max_messages or max_bytes of payload per wakeup."""
+        while not self._tx_stop.is_set():
+            try:
+                batch = [self._tx_q.get(timeout=0.25)]
+            except queue.Empty:
+                continue
+            batch_bytes = batch[0][1]
+            while len(batch) < max_messages and batch_bytes < max_bytes:
+                try:
+                    item = self._tx_q.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+                batch_bytes += item[1]
+            for job, _nbytes, _not_running_result, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(job())
+                except Exception as e:
+                    future.set_exception(e)
+        # Fail whatever was queued after shutdown began
+        while True:
+            try:
+                _job, _nbytes, not_running_result, future = self._tx_q.get_nowait()
+            except queue.Empty:
+                break
+            if future.set_running_or_notify_cancel():
+                future.set_result(not_running_result)
+
+    def _send_message_now(self, text: str, destination_id_hex: str = None, channel_index: int = None,
+                          payload: bytes = None) -> Tuple[bool, str]:
         if not self.is_connected:
             return False, "Not connected to Meshtastic device"
             
-        log_prefix = f"[send_message@{datetime.now().isoformat()}]"
-        # Ensure text is a string and handle it safely for logging
-        text_str = str(text) if text is not None else ""
-        log_info(f"{log_prefix} Attempting to send message.")
-        log_info(f"{log_prefix} Text type: {type(text)}")
-        log_info(f"{log_prefix} Text value: {repr(text)}")
-        log_info(f"{log_prefix} Params: text='{text_str[:50]}', destination_id_hex={destination_id_hex}, channel_index={channel_index}")
+        log_prefix = f"[send_message#{next(self._tx_seq)}]"
+        # Formatting is deferred to the logger; nothing is built when INFO is disabled
+        logger.info("%s Attempting to send message.", log_prefix)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s Text type: %s", log_prefix, type(text))
+            logger.debug("%s Text value: %r", log_prefix, text)
+        logger.info("%s Params: text='%.50s', destination_id_hex=%s, channel_index=%s",
+                    log_prefix, text, destination_id_hex, channel_index)
         
         if not self.interface or not self.is_connected:
             msg = f"{log_prefix} ERROR: Meshtastic not connected. Cannot send message."
-            print(msg)
             log_error(msg)
             return (False, "not_connected")
         
+        if payload is None:
+            payload = text.encode('utf-8')
         if not isinstance(channel_index, int) or channel_index < 0:
-            log_info(f"{log_prefix} Invalid channel_index '{channel_index}', defaulting to 0.")
+            logger.info("%s Invalid channel_index '%s', defaulting to 0.", log_prefix, channel_index)
             channel_index = 0
         
         try:
-            is_broadcast_destination = False
-            if destination_id_hex:
-                dest_lower = destination_id_hex.lower()
-                if dest_lower == "broadcast" or dest_lower == f"{meshtastic.BROADCAST_NUM:x}".lower():
-                    is_broadcast_destination = True
-            
-            log_info(f"{log_prefix} is_broadcast_destination: {is_broadcast_destination}")
-            
-            if destination_id_hex and not is_broadcast_destination:
-                try:
-                    dest_node_num = int(destination_id_hex, 16)
-                    log_info(f"{log_prefix} Sending DM to node {dest_node_num:x}")
-                    before = datetime.now()
-                    # For DMs, don't specify channelIndex to use default channel
-                    self.interface.sendText(text, destinationId=dest_node_num, wantAck=True)
-                    after = datetime.now()
-                    log_info(f"{log_prefix} sendText() for DM completed in {(after-before).total_seconds():.3f}s")
-                    self._conn_sm.update_activity()
-                    return (True, "dm_sent")
-                except ValueError:
+            # Parse the destination once; "broadcast" and ffffffff (any case) both mean broadcast
+            dest_node_num = _BROADCAST_NUM
+            if destination_id_hex and destination_id_hex.lower() != "broadcast":
+                if not _is_hex_id(destination_id_hex):
                     msg = f"{log_prefix} ERROR: Invalid destination_id_hex format '{destination_id_hex}'. Cannot send DM."
-                    print(msg)
                     log_error(msg)
                     return (False, "invalid_destination_id_hex")
+                dest_node_num = int(destination_id_hex, 16)
+            is_broadcast_destination = dest_node_num == _BROADCAST_NUM
+            
+            logger.info("%s is_broadcast_destination: %s", log_prefix, is_broadcast_destination)
+            
+            if not is_broadcast_destination:
+                logger.info("%s Sending DM to node %x", log_prefix, dest_node_num)
+                before = time.perf_counter()
+                # For DMs, don't specify channelIndex to use default channel
+                self.interface.sendData(payload, destinationId=dest_node_num,
+                                        portNum=portnums_pb2.PortNum.TEXT_MESSAGE_APP, wantAck=True)
+                logger.info("%s sendData() for DM completed in %.3fs", log_prefix, time.perf_counter() - before)
+                self._conn_sm.update_activity()
+                return (True, "dm_sent")
             else:
-                log_info(f"{log_prefix} Sending channel message on channel {channel_index}")
-                before = datetime.now()
-                self.interface.sendText(text, channelIndex=channel_index, wantAck=False)
-                after = datetime.now()
-                log_info(f"{log_prefix} sendText() for channel completed in {(after-before).total_seconds():.3f}s")
+                logger.info("%s Sending channel message on channel %s", log_prefix, channel_index)
+                before = time.perf_counter()
+                self.interface.sendData(payload, portNum=portnums_pb2.PortNum.TEXT_MESSAGE_APP,
+                                        wantAck=False, channelIndex=channel_index)
+                logger.info("%s sendData() for channel completed in %.3fs", log_prefix, time.perf_counter() - before)
                 self._conn_sm.update_activity()
                 return (True, "channel_sent")
         except BrokenPipeError as bpe:
             msg = f"{log_prefix} ERROR sending Meshtastic message (BrokenPipeError): {bpe}. Connection likely lost."
-            print(msg)
             log_error(msg)
             self.is_connected = False 
             if hasattr(self.interface, '_disconnected'): 
                 try: self.interface._disconnected()
                 except: pass
-            log_error(f"{log_prefix} BrokenPipeError traceback: {traceback.format_exc()}")
+            if _DEBUG_TB:
+                log_error(f"{log_prefix} BrokenPipeError traceback: {traceback.format_exc()}")
             return (False, "broken_pipe")
         except Exception as e:
             msg = f"{log_prefix} ERROR sending Meshtastic message: {e}"
-            print(msg)
             log_error(msg)
-            log_error(f"{log_prefix} Exception traceback: {traceback.format_exc()}")
+            # Disconnect-type OSErrors are expected during reconnect storms; don't format them
+            if _DEBUG_TB and not isinstance(e, OSError):
+                log_error(f"{log_prefix} Exception traceback: {traceback.format_exc()}")
             if "not connected" in str(e).lower() or "disconnected" in str(e).lower() or "pipe" in str(e).lower():
                 self.is_connected = False
             return (False, str(e))
 
+    def send_batch(self, messages: Iterable[Tuple[str, Optional[str], Optional[int]]]) -> List[Tuple[bool, str]]:
+        """Send several (text, destination_id_hex, channel_index) messages and wait for all results.
+
+        The TX worker sends them back to back; once the connection drops the
+        remaining messages fail without touching the interface.
+        """
+        return [future.result() for future in self.send_messages_batch(messages)]
+
+    def send_traceroute(self, destination_id_hex: str, channel_index: int = 0) -> Future:
+        """Queue a traceroute request for the TX worker; the Future resolves to True once sent.
+
+        The reply arrives as a TRACEROUTE_APP packet and is passed to
+        on_traceroute_reply_callback.
+        """
+        future = Future()
+        if not self.interface or not self.is_connected:
+            future.set_result(False)
+            return future
+        if not destination_id_hex or not _is_hex_id(destination_id_hex):
+            log_error(f"Invalid traceroute destination '{destination_id_hex}'.")
+            future.set_result(False)
+            return future
+        return self._submit_tx(partial(self._send_traceroute_now, int(destination_id_hex, 16), channel_index), 0, False)
+
+    def _send_traceroute_now(self, dest_node_num: int, channel_index: int) -> bool:
+        if not self.interface or not self.is_connected:
+            return False
+        try:
+            self.interface.sendData(
+                mesh_pb2.RouteDiscovery(),
+                destinationId=dest_node_num,
+                portNum=portnums_pb2.PortNum.TRACEROUTE_APP,
+                wantResponse=True,
+                channelIndex=channel_index,
+            )
+            self._conn_sm.update_activity()
+            return True
+        except Exception as e:
+            log_error(f"Failed to send traceroute to !{dest_node_num:x}: {e}")
+            return False
+
     def list_channels(self):
         if not self.interface or not self.is_connected:
-            print("ERROR: Meshtastic not connected. Cannot list channels.")
+            log_error("Meshtastic not connected. Cannot list channels.")
             return [] # Return empty list on error
-        
+        if not self._channels_dirty and self._channels_cache is not None:
+            return list(self._channels_cache)
+        # Clear first so an invalidation that races with the rebuild is not lost
+        self._channels_dirty = False
+        self._channels_cache = None
+
         channels_info = []
         try:
             if self.interface and hasattr(self.interface, 'channels') and self.interface.channels:
@@ -388,20 +678,18 @@ class MeshtasticHandler:
                     elif settings and hasattr(settings, 'name') and settings.name:
                         name = settings.name
 
-                    try: 
-                        role_name = str(role) 
-                        if mesh_pb2 and hasattr(mesh_pb2, 'Channel') and hasattr(mesh_pb2.Channel, 'Role') and hasattr(mesh_pb2.Channel.Role, 'Name'):
-                            role_name = mesh_pb2.Channel.Role.Name(role) 
-                    except: pass
+                    role_name = _ROLE_NAMES.get(role, str(role))
 
                     # info_str = f"  Index: {ch_index}, Name: \"{name}\", Role: {role_name}"
                     # print(info_str) # Removed direct print
                     channels_info.append({"index": ch_index, "name": name, "role": role_name})
                 # print("")
+                self._channels_cache = channels_info
+                return list(channels_info)
             else:
-                print("INFO: No channel information available from device (interface.channels is empty or None).")
+                log_info("No channel information available from device (interface.channels is empty or None).")
         except Exception as e:
-            print(f"ERROR listing channels: {e}")
+            log_error(f"Error listing channels: {e}")
             traceback.print_exc()
         return channels_info
 
@@ -410,23 +698,41 @@ class MeshtasticHandler:
         return self._conn_sm.get_connection_status()
 
     def close(self):
-        print("Closing Meshtastic interface...")
-        # Shutdown state machine (stops monitor thread, timers)
-        self._conn_sm.shutdown()
-
+        if self._closed:
+            return
+        self._closed = True  # connection/receive callbacks racing with shutdown now return early
+        try:
+            self._err_q.put_nowait(None)  # stop _err_drain
+        except queue.Full:
+            pass
+        log_info("Closing Meshtastic interface...")
+        # Stop the TX worker; queued messages resolve as not_connected
+        with self._tx_lock:
+            self._tx_stop.set()
+
+        # interface.close() joins the reader thread (slow on serial), so start it first and
+        # unsubscribe / stop the worker and state machine while it runs
+        closer = None
         if self.interface:
-            try:
-                pub.unsubscribe(self._on_receive_internal, "meshtastic.receive")
-                pub.unsubscribe(self._on_connection_established, "meshtastic.connection.established")
-                pub.unsubscribe(self._on_connection_lost, "meshtastic.connection.lost")
-            except Exception as e_unsub:
-                print(f"Warning: Error during pubsub unsubscribe: {e_unsub}")
+            closer = threading.Thread(target=self._close_interface, args=(self.interface,),
+                                      name="MeshtasticClose", daemon=True)
+            closer.start()
+            self._unsubscribe_events()
 
-            try:
-                self.interface.close()
-            except Exception as e_close:
-                print(f"Warning: Error closing Meshtastic interface: {e_close}")
+        if self._tx_thread and self._tx_thread is not threading.current_thread():
+            self._tx_thread.join(timeout=2.0)
+        # Shutdown state machine (stops monitor thread, timers)
+        self._conn_sm.shutdown()
 
+        if closer is not None:
+            closer.join(timeout=2.0)
             self.interface = None
-        print("Meshtastic interface closed.")
+        log_info("Meshtastic interface closed.")
+
+    @staticmethod
+    def _close_interface(interface):
+        try:
+            interface.close()
+        except Exception as e_close:
+            log_warning(f"Error closing Meshtastic interface: {e_close}")
 
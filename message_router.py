@@ -8,18 +8,100 @@ The caller (CLI or TUI) only needs to call `router.on_message(...)` and act
 on the returned `RouteResult`.
 """
 
+import functools
+import logging
 import re
+import threading
 import time
 import random
-import traceback
+from collections import OrderedDict
 import meshtastic
 from dataclasses import dataclass, field
 from typing import Optional, List
 
-from hal_bot import HalBot
+from hal_bot import HalBot, normalize_command_text
 from ai_bridge import AIBridge
 from conversation_manager import ConversationManager
 
+logger = logging.getLogger('MessageRouter')
+
+# Optional faster regex engine for URL scanning: RE2 (google-re2; linear time, no
+# backtracking), else the regex module, else stdlib re. Case-insensitivity is inline in
+# the pattern because RE2's module takes no flags.
+try:
+    import re2 as re_fast
+    _URL_FLAGS = 0
+except ImportError:
+    try:
+        import regex as re_fast
+        _URL_FLAGS = re_fast.V1
+    except ImportError:
+        re_fast = re
+        _URL_FLAGS = 0
+
+# Destination ids that mean "everyone" (lowercase hex of BROADCAST_NUM, or the literal)
+BROADCAST_IDS = frozenset({f"{meshtastic.BROADCAST_NUM:x}", "broadcast"})
+
+
+
+class ReplyTimes(OrderedDict):
+    """conversation_id -> time.monotonic() of our last reply, -inf if never.
+
+    Bounded: once maxsize conversations are tracked the least recently
+    replied-to one is forgotten (its cooldown is long over by then).
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __missing__(self, key):
+        return float('-inf')  # lookups don't insert the key
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class ResponseCache(OrderedDict):
+    """(conversation_id, sender_id, normalized prompt) -> (time.monotonic(), reply).
+
+    Lets a prompt the same sender repeats in the same conversation within ttl
+    seconds reuse the earlier reply instead of another AI call. ttl <= 0
+    disables it. Bounded like ReplyTimes; shared by the AI worker threads, so
+    reads and writes take a lock.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256):
+        super().__init__()
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(conversation_id: str, sender_id: str, text: str):
+        return conversation_id, sender_id, " ".join(text.lower().split())
+
+    def get_fresh(self, conversation_id: str, sender_id: str, text: str) -> Optional[str]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            hit = self.get(self._key(conversation_id, sender_id, text))
+        if hit is None or time.monotonic() - hit[0] >= self.ttl:
+            return None
+        return hit[1]
+
+    def put(self, conversation_id: str, sender_id: str, text: str, reply: str):
+        if self.ttl <= 0 or not (reply and reply.strip()):
+            return
+        key = self._key(conversation_id, sender_id, text)
+        with self._lock:
+            self[key] = (time.monotonic(), reply)
+            self.move_to_end(key)
+            if len(self) > self.maxsize:
+                self.popitem(last=False)
 
 # ---------------------------------------------------------------------------
 # Data classes
@@ -95,8 +177,8 @@ class MessageRouter:
         self.meshtastic_handler = meshtastic_handler
 
         # URL detection
-        self.url_pattern = re.compile(
-            r'https?://[^\s/$.?#].[^\s]*', re.IGNORECASE
+        self.url_pattern = re_fast.compile(
+            r'(?i)\bhttps?://[^\s/$.?#].[^\s]*', _URL_FLAGS
         )
         # Info-request patterns (weather, search, extract)
         self.weather_pattern = re.compile(
@@ -114,18 +196,33 @@ class MessageRouter:
         )
 
         # Human-like behaviour
-        self.last_response_times: dict = {}
+        self.last_response_times = ReplyTimes()
         self.ai_response_probability = getattr(app_config, 'AI_RESPONSE_PROBABILITY', 0.85)
         self.ai_min_delay = getattr(app_config, 'AI_MIN_RESPONSE_DELAY_S', 2)
         self.ai_max_delay = getattr(app_config, 'AI_MAX_RESPONSE_DELAY_S', 8)
         self.ai_cooldown = getattr(app_config, 'AI_RESPONSE_COOLDOWN_S', 60)
+        self.response_cache = ResponseCache(getattr(app_config, 'AI_RESPONSE_CACHE_TTL_S', 0))
         self.bot_name = getattr(app_config, 'BOT_NAME', 'Eva')
+        self._bot_name_lower = self.bot_name.lower()
         self.enable_ai_triage = getattr(app_config, 'ENABLE_AI_TRIAGE_ON_CHANNELS', False)
         self.triage_context_count = getattr(app_config, 'TRIAGE_CONTEXT_MESSAGE_COUNT', 3)
         self.active_channel = getattr(app_config, 'ACTIVE_MESHTASTIC_CHANNEL_INDEX', 0)
         self.ai_enabled = getattr(app_config, 'AI_ENABLED', True)
         self.bot_commands_enabled = getattr(app_config, 'BOT_COMMANDS_ENABLED', True)
 
+        # Our own node id rarely changes; normalize it only when it does
+        self._ai_node_id_raw = None
+        self._ai_node_id = None
+
+        # Conversation ids depend only on the canonicalized (sender, channel, ai, dest) tuple
+        @functools.lru_cache(maxsize=1024)
+        def _conv_id_cached(sender, channel, ai, dest):
+            return conversation_manager._get_conversation_id(
+                sender_id_hex=sender, channel_id=channel,
+                ai_node_id_hex=ai, destination_id_hex=dest,
+            )
+        self._conv_id_cached = _conv_id_cached
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -179,6 +276,26 @@ class MessageRouter:
         """
         conv_id = ctx_or_conv_id if isinstance(ctx_or_conv_id, str) else ctx_or_conv_id.conversation_id
 
+        if not self.is_cacheable(text, skip_triage or is_dm):
+            return self._generate_ai_response(conv_id, text, sender_name, sender_id, is_dm)
+        response = self.response_cache.get_fresh(conv_id, sender_id, text)
+        if response is None:
+            response = self._generate_ai_response(conv_id, text, sender_name, sender_id, is_dm)
+            self.response_cache.put(conv_id, sender_id, text, response)
+        return response
+
+    def is_cacheable(self, text: str, skip_triage: bool) -> bool:
+        """Whether the reply to *text* may be served from / stored in response_cache.
+
+        Only when triage is skipped anyway (a hit must not bypass it), and never for
+        URL analysis or weather/search/extract lookups, whose answers go stale.
+        """
+        if not skip_triage or "://" in text:
+            return False
+        return not (self.weather_pattern.search(text) or self.search_pattern.search(text)
+                    or self.extract_pattern.search(text))
+
+    def _generate_ai_response(self, conv_id, text, sender_name, sender_id, is_dm) -> Optional[str]:
         context_history = self.conversation_manager.get_contextual_history(
             conv_id, for_user_name=sender_name
         )
@@ -188,14 +305,17 @@ class MessageRouter:
 
         # URL analysis
         web_analysis = None
-        urls = self.url_pattern.findall(text)
-        if urls:
+        detected_url = None
+        if "://" in text:  # cheap reject before running the regex
+            url_match = self.url_pattern.search(text)
+            detected_url = url_match.group(0) if url_match else None
+        if detected_url:
             try:
-                web_analysis = self.ai_bridge.analyze_url_content(urls[0])
+                web_analysis = self.ai_bridge.analyze_url_content(detected_url)
                 if web_analysis:
-                    self.conversation_manager.add_url_analysis(conv_id, urls[0], web_analysis)
+                    self.conversation_manager.add_url_analysis(conv_id, detected_url, web_analysis)
             except Exception as e:
-                print(f"ERROR: URL analysis failed: {e}")
+                logger.error("URL analysis failed for %s: %r", detected_url, e)
                 web_analysis = f"[Error analyzing URL]"
 
         if specific_info:
@@ -203,15 +323,15 @@ class MessageRouter:
                            if web_analysis else f"Specific Information: {specific_info}")
 
         # If no specific info and no URL, try AI web agent
-        if not specific_info and not urls:
+        if not specific_info and not detected_url:
             try:
                 response = self.ai_bridge.get_response_with_web_search(
                     context_history, text, sender_name, sender_id
                 )
                 if response and response.strip():
                     return response
-            except Exception:
-                traceback.print_exc()
+            except Exception as e:
+                logger.error("Web-search AI response failed: %r", e)
 
         # Standard AI response
         response = self.ai_bridge.get_response(
@@ -221,16 +341,23 @@ class MessageRouter:
         )
         return response
 
-    def apply_human_delay(self):
-        """Apply random delay to simulate human-like response time."""
+    def apply_human_delay(self, stop_event=None) -> bool:
+        """Apply random delay to simulate human-like response time.
+
+        If *stop_event* is given the delay is cut short when it is set.
+        Returns True if the wait was interrupted by *stop_event*.
+        """
         if self.ai_min_delay >= 0 and self.ai_max_delay > self.ai_min_delay:
-            delay = random.uniform(self.ai_min_delay, self.ai_max_delay)
+            delay = self.ai_min_delay + (self.ai_max_delay - self.ai_min_delay) * random.random()
+            if stop_event is not None:
+                return stop_event.wait(timeout=delay)
             time.sleep(delay)
+        return False
 
     def record_response(self, conversation_id: str, response_text: str):
         """Save AI response to conversation and update cooldown timer."""
         self.conversation_manager.add_message(conversation_id, "assistant", response_text)
-        self.last_response_times[conversation_id] = time.time()
+        self.last_response_times[conversation_id] = time.monotonic()
 
     # ------------------------------------------------------------------
     # Internal: context building
@@ -240,20 +367,18 @@ class MessageRouter:
                        destination_id, channel_id, ai_node_id) -> MessageContext:
         sender_id = sender_id.lower().lstrip('!')
         destination_id = (destination_id or "").lower().lstrip('!')
-        ai_node_id = ai_node_id.lower().lstrip('!') if ai_node_id else None
+        if ai_node_id != self._ai_node_id_raw:
+            self._ai_node_id_raw = ai_node_id
+            self._ai_node_id = ai_node_id.lower().lstrip('!') if ai_node_id else None
+        ai_node_id = self._ai_node_id
         eff_ch = channel_id if channel_id is not None else 0
 
-        broadcast_hex = f"{meshtastic.BROADCAST_NUM:x}".lower()
-        is_broadcast = destination_id in (broadcast_hex, "broadcast")
+        is_broadcast = destination_id in BROADCAST_IDS
         is_dm = bool(ai_node_id and destination_id == ai_node_id and sender_id != ai_node_id)
 
-        conv_params = {
-            "sender_id_hex": sender_id,
-            "channel_id": eff_ch if not is_dm else None,
-            "ai_node_id_hex": ai_node_id,
-            "destination_id_hex": destination_id,
-        }
-        conv_id = self.conversation_manager._get_conversation_id(**conv_params)
+        conv_id = self._conv_id_cached(
+            sender_id, eff_ch if not is_dm else None, ai_node_id, destination_id
+        )
 
         return MessageContext(
             text=text,
@@ -309,12 +434,13 @@ class MessageRouter:
     # ------------------------------------------------------------------
 
     def _check_hal_bot(self, ctx: MessageContext) -> Optional[RouteResult]:
-        if not self.hal_bot.should_handle_message(ctx.text):
+        text, text_lower = normalize_command_text(ctx.text)
+        if not self.hal_bot.should_handle_message(text, text_lower):
             return None
 
         hal_result = self.hal_bot.handle_command(
-            ctx.text, ctx.sender_id, ctx.sender_name,
-            ctx.channel_id, ctx.is_dm_to_ai
+            text, ctx.sender_id, ctx.sender_name,
+            ctx.channel_id, ctx.is_dm_to_ai, text_lower=text_lower
         )
         if not hal_result or not isinstance(hal_result, dict):
             return None
@@ -335,6 +461,11 @@ class MessageRouter:
     # Internal: AI response decision
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _triage_speaker(entry: dict) -> str:
+        name = entry.get("user_name")
+        return name if name is not None else f"Node-{entry.get('node_id', '????')}"
+
     def _check_ai_response(self, ctx: MessageContext) -> RouteResult:
         result = RouteResult(
             conversation_id=ctx.conversation_id,
@@ -352,9 +483,7 @@ class MessageRouter:
             skip_triage = True
         elif ctx.is_broadcast:
             # Check if bot is mentioned by name
-            text_lower = ctx.text.lower()
-            bot_name_lower = self.bot_name.lower()
-            directly_addressed = bot_name_lower in text_lower
+            directly_addressed = self._bot_name_lower in ctx.text.lower()
 
             if directly_addressed:
                 # Someone called Eva by name -> always respond
@@ -362,14 +491,13 @@ class MessageRouter:
                 skip_triage = True
             elif self.enable_ai_triage:
                 # Let triage AI decide if Eva should join the conversation
-                history_raw = self.conversation_manager.load_conversation(ctx.conversation_id)
-                triage_msgs = []
-                for entry in history_raw[-(self.triage_context_count + 1):-1]:
-                    if entry.get("role") == "user":
-                        name = entry.get("user_name", f"Node-{entry.get('node_id', '????')}")
-                        triage_msgs.append(f"{name}: {entry.get('content', '')}")
-                    elif entry.get("role") == "assistant":
-                        triage_msgs.append(f"{self.bot_name}: {entry.get('content', '')}")
+                recent = self.conversation_manager.get_recent(
+                    ctx.conversation_id, self.triage_context_count + 1)[:-1]
+                bot_name = self.bot_name
+                triage_msgs = [
+                    f"{self._triage_speaker(entry) if entry.get('role') == 'user' else bot_name}: {entry.get('content', '')}"
+                    for entry in recent if entry.get("role") in ("user", "assistant")
+                ]
                 if self.ai_bridge.should_main_ai_respond(triage_msgs, ctx.text, ctx.sender_name):
                     should_respond = True
             else:
@@ -380,14 +508,13 @@ class MessageRouter:
             return result
 
         # Cooldown check
-        now = time.time()
-        if self.ai_cooldown > 0:
-            last = self.last_response_times.get(ctx.conversation_id, 0)
-            if (now - last) < self.ai_cooldown:
+        cooldown = self.ai_cooldown
+        if cooldown > 0:
+            if (time.monotonic() - self.last_response_times[ctx.conversation_id]) < cooldown:
                 return result
 
-        # Probability check (skip if directly addressed)
-        if not (ctx.is_dm_to_ai or self.bot_name.lower() in ctx.text.lower()):
+        # Probability check (skip_triage is set exactly for DMs and direct mentions)
+        if not skip_triage:
             if random.random() > self.ai_response_probability:
                 return result
 
@@ -18,12 +18,12 @@ def test_meshtastic_send():
             on_message_received_callback=lambda *args: print(f"Received: {args}")
         )
         
-        # Wait for connection
+        # Wait for connection (usually already up when the constructor returns); back off up to 4s per wait
         retries = 10
-        while retries > 0 and not handler.is_connected:
-            print(f"Waiting for connection... ({retries})")
-            time.sleep(1)
-            retries -= 1
+        for attempt in range(retries):
+            if handler._connected_event.wait(timeout=min(0.5 * 1.5 ** attempt, 4.0)):
+                break
+            print(f"Waiting for connection... ({retries - attempt - 1})")
         
         if not handler.is_connected:
             print("ERROR: Could not connect to Meshtastic")
@@ -0,0 +1,95 @@
+import json
+import types
+
+import pytest
+
+from conversation_manager import ConversationManager, FLUSH_MAX_PENDING
+
+
+@pytest.fixture
+def manager(tmp_path):
+    cm = ConversationManager(types.SimpleNamespace(), None, storage_path=str(tmp_path) + "/")
+    yield cm
+    cm.flush()
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestBuffering:
+    def test_load_conversation_merges_pending(self, manager, tmp_path):
+        manager.add_message("ch_0_broadcast", "user", "first")
+        manager.flush()
+        manager.add_message("ch_0_broadcast", "user", "second")
+
+        assert manager._pending["ch_0_broadcast"]
+        assert [m["content"] for m in manager.load_conversation("ch_0_broadcast")] == ["first", "second"]
+        assert [m["content"] for m in _lines(tmp_path / "ch_0_broadcast.jsonl")] == ["first"]
+
+    def test_flush_at_max_pending(self, manager, tmp_path):
+        for i in range(FLUSH_MAX_PENDING - 1):
+            manager.add_message("ch_1_broadcast", "user", f"m{i}")
+        assert not (tmp_path / "ch_1_broadcast.jsonl").exists()
+
+        manager.add_message("ch_1_broadcast", "user", "last")
+
+        assert manager._pending == {}
+        assert manager._flush_timer is None
+        assert len(_lines(tmp_path / "ch_1_broadcast.jsonl")) == FLUSH_MAX_PENDING
+
+    def test_message_count_tracks_adds(self, manager):
+        assert manager.message_count("dm_a_b") == 0
+        manager.add_message("dm_a_b", "user", "hi")
+        manager.flush()
+        manager.add_message("dm_a_b", "assistant", "hello")
+        assert manager.message_count("dm_a_b") == 2
+
+
+class TestJsonLines:
+    def test_legacy_json_is_converted_and_moved_aside(self, manager, tmp_path):
+        legacy = tmp_path / "ch_0_broadcast.json"
+        legacy.write_text(json.dumps([{"role": "user", "content": "old", "timestamp": 1}], indent=2))
+
+        assert [m["content"] for m in manager.load_conversation("ch_0_broadcast")] == ["old"]
+        manager.add_message("ch_0_broadcast", "user", "new")
+        manager.flush()
+
+        assert not legacy.exists()
+        assert (tmp_path / "ch_0_broadcast.json.bak").exists()
+        assert [m["content"] for m in _lines(tmp_path / "ch_0_broadcast.jsonl")] == ["old", "new"]
+        assert manager.message_count("ch_0_broadcast") == 2
+
+    def test_load_tail(self, manager):
+        for i in range(5):
+            manager.add_message("ch_2_broadcast", "user", f"m{i}")
+        manager.flush()
+        manager.add_message("ch_2_broadcast", "user", "pending")
+
+        assert [m["content"] for m in manager.load_tail("ch_2_broadcast", 3)] == ["m3", "m4", "pending"]
+        assert manager.load_tail("missing", 3) == []
+
+    def test_torn_last_line(self, tmp_path):
+        path = tmp_path / "dm_a_b.jsonl"
+        path.write_text('{"role":"user","content":"ok","timestamp":1}\n{"role":"us')
+        cm = ConversationManager(types.SimpleNamespace(), None, storage_path=str(tmp_path) + "/")
+
+        assert [m["content"] for m in cm.load_conversation("dm_a_b")] == ["ok"]
+        assert [m["content"] for m in cm.load_tail("dm_a_b", 5)] == ["ok"]
+        assert cm.message_count("dm_a_b") == 1
+
+        # The next append drops the fragment instead of gluing onto it
+        cm.add_message("dm_a_b", "user", "after")
+        cm.flush()
+        assert [m["content"] for m in _lines(path)] == ["ok", "after"]
+        assert ConversationManager(types.SimpleNamespace(), None, str(tmp_path) + "/").message_count("dm_a_b") == 2
+
+    def test_unterminated_complete_last_line_is_kept(self, manager, tmp_path):
+        path = tmp_path / "dm_c_d.jsonl"
+        path.write_text('{"role":"user","content":"edited","timestamp":1}')
+
+        assert manager.message_count("dm_c_d") == 1
+        manager.add_message("dm_c_d", "user", "next")
+        manager.flush()
+        assert [m["content"] for m in _lines(path)] == ["edited", "next"]
+
@@ -0,0 +1,95 @@
+import types
+
+import pytest
+
+import message_router
+from message_router import MessageRouter, ReplyTimes, ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(message_router.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestResponseCache:
+    def test_hit_uses_normalized_prompt(self, clock):
+        cache = ResponseCache(ttl=60)
+        cache.put("ch_0_broadcast", "!a", "What is  the Weather?", "sunny")
+
+        assert cache.get_fresh("ch_0_broadcast", "!a", "what is the weather?") == "sunny"
+        assert cache.get_fresh("ch_1_broadcast", "!a", "what is the weather?") is None
+        assert cache.get_fresh("ch_0_broadcast", "!b", "what is the weather?") is None
+
+    def test_expires_after_ttl(self, clock):
+        cache = ResponseCache(ttl=60)
+        cache.put("c", "!a", "ping", "pong")
+
+        clock[0] += 59
+        assert cache.get_fresh("c", "!a", "ping") == "pong"
+        clock[0] += 1
+        assert cache.get_fresh("c", "!a", "ping") is None
+
+    def test_ttl_zero_disables(self, clock):
+        cache = ResponseCache(ttl=0)
+        cache.put("c", "!a", "ping", "pong")
+
+        assert len(cache) == 0
+        assert cache.get_fresh("c", "!a", "ping") is None
+
+    def test_blank_reply_not_cached(self, clock):
+        cache = ResponseCache(ttl=60)
+        cache.put("c", "!a", "ping", "   ")
+
+        assert len(cache) == 0
+
+    def test_evicts_oldest_at_capacity(self, clock):
+        cache = ResponseCache(ttl=60, maxsize=2)
+        cache.put("c", "!a", "a", "1")
+        cache.put("c", "!a", "b", "2")
+        cache.put("c", "!a", "a", "1")  # refresh moves "a" to the end
+        cache.put("c", "!a", "c", "3")
+
+        assert len(cache) == 2
+        assert cache.get_fresh("c", "!a", "b") is None
+        assert cache.get_fresh("c", "!a", "a") == "1"
+        assert cache.get_fresh("c", "!a", "c") == "3"
+
+
+class TestReplyTimes:
+    def test_missing_key_is_minus_inf_without_inserting(self):
+        times = ReplyTimes()
+
+        assert times["never"] == float("-inf")
+        assert "never" not in times
+        assert len(times) == 0
+
+    def test_evicts_least_recent_at_capacity(self):
+        times = ReplyTimes(maxsize=2)
+        times["a"] = 1.0
+        times["b"] = 2.0
+        times["a"] = 3.0  # reassigning moves "a" to the end
+        times["c"] = 4.0
+
+        assert list(times) == ["a", "c"]
+        assert times["b"] == float("-inf")
+
+
+class TestIsCacheable:
+    @pytest.fixture
+    def router(self):
+        return MessageRouter(types.SimpleNamespace(), None, None, None, None)
+
+    def test_only_when_triage_is_skipped(self, router):
+        assert router.is_cacheable("hello there", skip_triage=True)
+        assert not router.is_cacheable("hello there", skip_triage=False)
+
+    @pytest.mark.parametrize("text", [
+        "look at https://example.com",
+        "weather in Zurich",
+        "search for lora antennas",
+        "get price from https://example.com/item",
+    ])
+    def test_time_sensitive_prompts(self, router, text):
+        assert not router.is_cacheable(text, skip_triage=True)
@@ -11,17 +11,22 @@ from textual.binding import Binding
 from textual.message import Message
 from textual import events
 from textual.css.query import NoMatches
-from datetime import datetime
 import time
 import threading
+from functools import lru_cache
 import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
+from dataclasses import dataclass
 from typing import Dict, List, Optional
 import meshtastic
 from meshtastic_handler import MeshtasticHandler
 from ai_bridge import AIBridge
 from conversation_manager import ConversationManager
 from hal_bot import HalBot
-from message_router import MessageRouter, RouteResult
+from message_router import MessageRouter, ReplyTimes, RouteResult
 try:
     from matrix_bridge import MatrixBridge
     HAS_MATRIX = True
@@ -35,6 +40,11 @@ from rich.table import Table
 from rich.console import RenderableType
 from rich.markup import escape as rich_escape
 
+try:
+    import orjson  # optional C JSON codec for the last-viewed state file
+except ImportError:
+    orjson = None
+
 try:
     from mesh_map import render_map_text
     HAS_MESH_MAP = True
@@ -47,8 +57,32 @@ import re
 import traceback
 import math
 
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_AI = 4  # AI replies generated at the same time (as main_app's executor)
+_LAST_VIEWED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "last_viewed.json")
+MESSAGE_QUEUE_SIZE = 256  # Inbound messages waiting for process_incoming_message; oldest dropped beyond this
+DISPLAY_MESSAGES = 200  # Messages written to the chat view when a conversation is opened
+
+# Chat view markup per sender kind: (name open, name close, text open, text close)
+_MSG_STYLE_AI = ("[bold #58a6ff]", "[/bold #58a6ff]", "[#58a6ff]", "[/#58a6ff]")
+_MSG_STYLE_YOU = ("[bold #3fb950]", "[/bold #3fb950]", "[#c9d1d9]", "[/#c9d1d9]")
+_MSG_STYLE_OTHER = ("[bold #d2a8ff]", "[/bold #d2a8ff]", "[#c9d1d9]", "[/#c9d1d9]")
+
+@dataclass(slots=True)
+class InboundMessage:
+    """A received mesh text message queued for process_incoming_message (ids normalized)"""
+    text: str
+    sender_id: str
+    sender_name: str
+    destination_id: str
+    channel_id: Optional[int]
+
 class AIProcessingWorker:
-    """Worker class to handle AI processing in a separate thread"""
+    """Worker class to handle AI processing as a task on the app's event loop"""
+    __slots__ = ('app', 'text', 'sender_id', 'sender_name', 'channel_id', 'is_dm',
+                 'conversation_id', 'url_pattern', 'skip_triage')
+
     def __init__(self, app, text: str, sender_id: str, sender_name: str, channel_id: int, is_dm: bool, conversation_id: str, url_pattern=None, skip_triage: bool = False):
         self.app = app
         self.text = text
@@ -61,65 +95,75 @@ class AIProcessingWorker:
         # Always skip triage for DMs
         self.skip_triage = True if is_dm else skip_triage
 
-    def run(self) -> None:
-        """Run the AI processing"""
+    async def run_async(self) -> None:
+        """Run the AI processing; only the blocking AI/file calls go to a thread"""
         try:
             log_info = getattr(self.app, 'log_info', print)
             log_error = getattr(self.app, 'log_error', print)
             log_info(f"[AIWorker] Starting for conv_id={self.conversation_id}, is_dm={self.is_dm}, sender_id={self.sender_id}, channel_id={self.channel_id}")
-            context_history = self.app.conversation_manager.get_contextual_history(
-                self.conversation_id, 
-                for_user_name=self.sender_name
-            )
-            log_info(f"[AIWorker] Context history loaded: {context_history[-2:] if context_history else 'EMPTY'}")
-            web_analysis_summary = None
-            if self.url_pattern:
-                urls_found = self.url_pattern.findall(self.text)
-                if urls_found:
-                    detected_url = urls_found[0]
+            # A repeat of a prompt answered moments ago reuses that reply
+            router = self.app.router
+            use_cache = router.is_cacheable(self.text, self.skip_triage)
+            ai_response = (router.response_cache.get_fresh(self.conversation_id, self.sender_id, self.text)
+                           if use_cache else None)
+            if ai_response is not None:
+                log_info(f"[AIWorker] Reusing cached reply for conv_id={self.conversation_id}")
+            else:
+                context_history = await asyncio.to_thread(
+                    self.app.conversation_manager.get_contextual_history,
+                    self.conversation_id, 
+                    for_user_name=self.sender_name
+                )
+                log_info(f"[AIWorker] Context history loaded: {context_history[-2:] if context_history else 'EMPTY'}")
+                web_analysis_summary = None
+                url_match = self.url_pattern.search(self.text) if self.url_pattern and "://" in self.text else None
+                if url_match:
+                    detected_url = url_match.group(0)
                     try:
-                        web_analysis_summary = self.app.ai_bridge.analyze_url_content(detected_url)
+                        web_analysis_summary = await asyncio.to_thread(self.app.ai_bridge.analyze_url_content, detected_url)
                         log_info(f"[AIWorker] Web analysis summary: {web_analysis_summary}")
                         # Save URL analysis to conversation history so AI remembers it
                         self.app.conversation_manager.add_url_analysis(self.conversation_id, detected_url, web_analysis_summary)
                     except Exception as e:
                         web_analysis_summary = f"[Error analyzing URL: {str(e)}]"
                         log_error(f"[AIWorker] Error analyzing URL: {e}")
-                    else:
-                        web_analysis_summary = None
-            ai_response = self.app.ai_bridge.get_response(
-                context_history,
-                self.text,
-                self.sender_name,
-                self.sender_id,
-                web_analysis_summary=web_analysis_summary,
-                skip_triage=self.skip_triage
-            )
+                ai_response = await asyncio.to_thread(
+                    self.app.ai_bridge.get_response,
+                    context_history,
+                    self.text,
+                    self.sender_name,
+                    self.sender_id,
+                    web_analysis_summary=web_analysis_summary,
+                    skip_triage=self.skip_triage
+                )
+                if use_cache:
+                    router.response_cache.put(self.conversation_id, self.sender_id, self.text, ai_response)
             log_info(f"[AIWorker] AI response: {ai_response}")
             if ai_response:
                 if self.app.ai_min_delay >= 0 and self.app.ai_max_delay > self.app.ai_min_delay:
                     delay = random.uniform(self.app.ai_min_delay, self.app.ai_max_delay)
                     log_info(f"[AIWorker] Applying delay: {delay:.2f}s")
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
                 self.app.conversation_manager.add_message(
                     self.conversation_id,
                     "assistant",
                     ai_response
                 )
-                self.app.last_response_times[self.conversation_id] = time.time()
+                self.app.last_response_times[self.conversation_id] = time.monotonic()
+                # The handler's TX worker does the send; just await its Future
                 if self.is_dm:
                     log_info(f"[AIWorker] Sending DM reply to {self.sender_id} on channel 0")
-                    success, reason = self.app.meshtastic_handler.send_message(
+                    success, reason = await asyncio.wrap_future(self.app.meshtastic_handler.send_message_async(
                         ai_response,
                         destination_id_hex=self.sender_id,
                         channel_index=0  # DMs always use channel 0
-                    )
+                    ))
                 else:
                     log_info(f"[AIWorker] Sending channel reply on channel {self.channel_id}")
-                    success, reason = self.app.meshtastic_handler.send_message(
+                    success, reason = await asyncio.wrap_future(self.app.meshtastic_handler.send_message_async(
                         ai_response,
                         channel_index=self.channel_id
-                    )
+                    ))
                 log_info(f"[AIWorker] send_message result: success={success}, reason={reason}")
                 # Forward AI reply to Matrix
                 if self.app.matrix_bridge:
@@ -132,30 +176,37 @@ class AIProcessingWorker:
                         is_dm=self.is_dm,
                     )
                 # Update UI
-                asyncio.run_coroutine_threadsafe(
-                    self.app.update_after_ai_response(
-                        self.conversation_id,
-                        success,
-                        reason,
-                        self.sender_name
-                    ),
-                    self.app.app_loop or asyncio.get_running_loop()
+                self.app._apply_ai_response_ui(
+                    self.conversation_id,
+                    success,
+                    reason,
+                    self.sender_name
                 )
             else:
                 log_error(f"[AIWorker] No valid AI response for {self.sender_name} in conv_id={self.conversation_id}")
         except Exception as e:
             log_error = getattr(self.app, 'log_error', print)
             log_error(f"[AIWorker] Exception: {e}")
-            traceback.print_exc()
+            logger.exception("[AIWorker] Exception: %s", e)
+
+_TIME_BUCKETS = ((86400, 'd'), (3600, 'h'), (60, 'm'))
+
+@lru_cache(maxsize=256)
+def _ago_text(age_s: int) -> str:
+    """'<n><unit> ago' for an age in whole seconds (rows in one redraw share ages)"""
+    for size, unit in _TIME_BUCKETS:
+        if age_s >= size:
+            return f"{age_s // size}{unit} ago"
+    return f"{age_s}s ago"
+
+# Connection type icons, resolved once: ASCII fallbacks unless stdout is UTF-8
+_UNICODE_OK = (getattr(sys.stdout, 'encoding', None) or '').lower().startswith('utf')
+_RADIO_ICON = "📡" if _UNICODE_OK else "R"   # LoRa radio
+_MQTT_ICON = "☁️" if _UNICODE_OK else "M"    # MQTT / internet
+_FAV_ICON = "★" if _UNICODE_OK else "*"      # Favorite
 
 class NodeListItem(ListItem):
     """Custom list item for nodes with connection type icons"""
-    # Connection type icons
-    ICONS = {
-        'radio':    ("📡", "R"),   # LoRa radio
-        'mqtt':     ("☁️",  "M"),   # MQTT / internet
-        'favorite': ("★",  "*"),   # Favorite
-    }
 
     def __init__(self, node_id: str, node_info: dict, is_favorite: bool = False, unread_count: int = 0):
         super().__init__()
@@ -163,72 +214,83 @@ class NodeListItem(ListItem):
         self.node_info = node_info
         self.is_favorite = is_favorite
         self.unread_count = unread_count
+        self.rendered_key = None
 
-    @staticmethod
-    def _icon(key: str) -> str:
-        uni, fallback = NodeListItem.ICONS.get(key, ("?", "?"))
-        try:
-            uni.encode('utf-8').decode('utf-8')
-            return uni
-        except UnicodeError:
-            return fallback
+    _BRACKET_RE = re.compile(r'\[.*?\]')
+    _WS_RE = re.compile(r'\s+')
 
-    def _sanitize_name(self, name: str) -> str:
+    @classmethod
+    def _sanitize_name(cls, name: str) -> str:
         if not name:
             return "Unknown"
-        name = re.sub(r'\[.*?\]', '', name)
-        name = ''.join(c for c in name if c.isprintable() or c.isspace())
-        return re.sub(r'\s+', ' ', name).strip()
+        name = cls._BRACKET_RE.sub('', name)
+        # Per-char filter only when needed; isprintable() scans in C and is true for most names
+        if not name.isprintable():
+            name = ''.join(c for c in name if c.isprintable() or c.isspace())
+        return cls._WS_RE.sub(' ', name).strip()
 
-    def compose(self) -> ComposeResult:
-        name = self._sanitize_name(self.node_info.get('long_name', 'Unknown'))
-        node_id = self.node_id
-        is_mqtt = self.node_info.get('connection_type') == 'tcp'
+    @staticmethod
+    def render_key(node_info: dict, is_favorite: bool, unread_count: int) -> tuple:
+        """Inputs compose() renders from; equal keys mean the row would look the same"""
+        return (node_info.get('long_name'), node_info.get('connection_type'), node_info.get('hops_away'),
+                NodeListItem._age_tag(node_info.get('last_heard', 0)), is_favorite, unread_count)
 
-        # Connection icon
-        if self.is_favorite:
-            conn_icon = self._icon('favorite')
-        elif is_mqtt:
-            conn_icon = self._icon('mqtt')
+    @staticmethod
+    def _age_tag(last_heard) -> str:
+        """Last heard age (rounded to full minutes/hours)"""
+        if not last_heard:
+            return ""
+        age_s = int(time.time() - last_heard)
+        if age_s < 120:
+            age_str = "1m"
+        elif age_s < 3600:
+            age_str = f"{round(age_s / 60)}m"
+        elif age_s < 86400:
+            age_str = f"{round(age_s / 3600)}h"
         else:
-            conn_icon = self._icon('radio')
+            age_str = f"{round(age_s / 86400)}d"
+        return f" {age_str}"
+
+    @classmethod
+    def display_text(cls, node_id: str, node_info: dict) -> str:
+        """Name and hop part of the row label, cached in node_info until its inputs change"""
+        is_favorite = node_info.get('is_favorite', False)
+        long_name = node_info.get('long_name', 'Unknown')
+        hops_away = node_info.get('hops_away')
+        version = hash((is_favorite, long_name, hops_away, node_info.get('connection_type'), node_id))
+        if node_info.get('_display_text_version') == version:
+            return node_info['_display_text']
+
+        name = cls._sanitize_name(long_name)
 
         # Default Meshtastic name check
-        is_default_name = False
         if name.startswith("Meshtastic ") and len(name) > 11:
             name_suffix = name[11:].strip()
             if node_id.endswith(name_suffix.lower()):
-                is_default_name = True
                 name = f"Node {name_suffix}"
 
         # Hop count
-        hops_away = self.node_info.get('hops_away')
         if hops_away is not None:
             hop_indicator = " [D]" if hops_away == 0 else f" [{hops_away}hop]"
         else:
             hop_indicator = ""
 
-        # Last heard age (rounded to full minutes/hours)
-        last_heard = self.node_info.get('last_heard', 0)
-        if last_heard:
-            age_s = int(time.time() - last_heard)
-            if age_s < 120:
-                age_str = "1m"
-            elif age_s < 3600:
-                age_str = f"{round(age_s / 60)}m"
-            elif age_s < 86400:
-                age_str = f"{round(age_s / 3600)}h"
-            else:
-                age_str = f"{round(age_s / 86400)}d"
-            age_tag = f" {age_str}"
-        else:
-            age_tag = ""
+        text = node_info['_display_text'] = f" {name}{hop_indicator}"
+        node_info['_display_text_version'] = version
+        return text
+
+    def compose(self) -> ComposeResult:
+        self.rendered_key = key = self.render_key(self.node_info, self.is_favorite, self.unread_count)
 
-        if is_default_name:
-            display_text = f"{conn_icon}{age_tag} {name}{hop_indicator}"
+        # Connection icon
+        if self.is_favorite:
+            conn_icon = _FAV_ICON
+        elif self.node_info.get('connection_type') == 'tcp':
+            conn_icon = _MQTT_ICON
         else:
-            display_text = f"{conn_icon}{age_tag} {name}{hop_indicator}"
+            conn_icon = _RADIO_ICON
 
+        display_text = f"{conn_icon}{key[3]}{self.display_text(self.node_id, self.node_info)}"
         style = "reverse" if self.unread_count > 0 else ""
         yield Label(display_text, classes=style, markup=False)
 
@@ -240,10 +302,23 @@ class ChannelListItem(ListItem):
         self.channel_name = channel_name
         self.unread_count = unread_count
 
-    def compose(self) -> ComposeResult:
+    def _label_text(self) -> str:
         badge = f" ({self.unread_count})" if self.unread_count > 0 else ""
+        return f"# {self.channel_name}{badge}"
+
+    def compose(self) -> ComposeResult:
         style = "unread" if self.unread_count > 0 else ""
-        yield Label(f"# {self.channel_name}{badge}", classes=style, markup=False)
+        self._label = Label(self._label_text(), classes=style, markup=False)
+        yield self._label
+
+    def set_row(self, channel_name: str, unread_count: int) -> None:
+        """Update name/unread on the mounted row without recreating it"""
+        if (channel_name, unread_count) == (self.channel_name, self.unread_count):
+            return
+        self.channel_name, self.unread_count = channel_name, unread_count
+        label = self._label
+        label.update(self._label_text())
+        label.set_class(unread_count > 0, "unread")
 
 class InfoPanel(Static):
     """Compact status bar for the sidebar bottom."""
@@ -251,14 +326,20 @@ class InfoPanel(Static):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.stats: dict | None = None
+        self._rendered: Text | None = None  # render() result for the current stats
 
     def set_stats(self, stats_dict: dict):
+        if stats_dict == self.stats:
+            return
         self.stats = stats_dict
+        self._rendered = None
         self.refresh()
 
     def render(self) -> RenderableType:  # type: ignore[override]
         if not self.stats:
             return Text(" -- ", style="dim")
+        if self._rendered is not None:
+            return self._rendered
         parts = []
         for key, val in self.stats.items():
             if key == "Status":
@@ -270,6 +351,7 @@ class InfoPanel(Static):
         for p in parts:
             line.append(p)
             line.append("  ")
+        self._rendered = line
         return line
 
 class NodeStatsPanel(Static):
@@ -278,17 +360,41 @@ class NodeStatsPanel(Static):
         super().__init__(**kwargs)
         self.selected_node_id = None
         self.node_data = {}
+        # (second, Panel): repaints within the same second reuse the panel; set_node() drops it
+        self._cached_panel = None
+        self._display_key_shown = None
         
     def set_node(self, node_id: str, node_info: dict):
         """Set the node to display statistics for"""
+        display_key = self._display_key(node_info)
+        if node_id == self.selected_node_id and display_key == self._display_key_shown:
+            return  # same node, nothing shown has changed
         self.selected_node_id = node_id
         self.node_data = node_info
+        self._display_key_shown = display_key
+        self._cached_panel = None
         self.refresh()
+
+    @staticmethod
+    def _display_key(node_info: dict) -> tuple:
+        """Values render() shows (node_info is mutated in place, so compare a snapshot)"""
+        get = node_info.get
+        history = tuple((p.get('timestamp'), p.get('rssi'), p.get('snr'))
+                        for p in get('signal_history', [])[-3:])
+        position = get('position')
+        position = tuple(position.values()) if position else None
+        return (get('long_name'), get('short_name'), get('node_id'), get('user_role'), get('connection_type'),
+                get('hops_away'), get('last_heard'), get('rssi'), get('snr'), history, position,
+                get('model'), get('battery_level'), get('uptime'))
         
     def render(self) -> RenderableType:
         """Render the detailed node statistics"""
         if not self.selected_node_id or not self.node_data:
             return Panel("[dim]Select a node\nto view stats[/dim]", title="Node Info", border_style="dim")
+        # Only the "ago" strings depend on the clock, and they have 1 s resolution
+        now_s = int(time.time())
+        if self._cached_panel is not None and self._cached_panel[0] == now_s:
+            return self._cached_panel[1]
 
         # Create main table
         table = Table(show_header=False, box=None, expand=True, padding=(0, 1))
@@ -368,24 +474,16 @@ class NodeStatsPanel(Static):
         if uptime:
             table.add_row("Up", f"[#8b949e]{uptime}[/]")
 
-        return Panel(table, title=f"[bold #58a6ff]{short_name}[/]", border_style="#30363d")
+        panel = Panel(table, title=f"[bold #58a6ff]{short_name}[/]", border_style="#30363d")
+        self._cached_panel = (now_s, panel)
+        return panel
     
     def _format_time_ago(self, timestamp: float) -> str:
         """Format time ago from timestamp"""
         if not timestamp:
             return "Unknown"
         
-        now = time.time()
-        diff = now - timestamp
-        
-        if diff < 60:
-            return f"{int(diff)}s ago"
-        elif diff < 3600:
-            return f"{int(diff // 60)}m ago"
-        elif diff < 86400:
-            return f"{int(diff // 3600)}h ago"
-        else:
-            return f"{int(diff // 86400)}d ago"
+        return _ago_text(int(time.time() - timestamp))
 
 class MeshMapPanel(Static):
     """ASCII map of mesh nodes based on GPS coordinates"""
@@ -740,7 +838,12 @@ class MeshtasticInteractive(App):
         self.ai_bridge = AIBridge(self.app_config)
         self.conversation_manager = ConversationManager(self.app_config, self.ai_bridge)
         self.app_loop = None  # Initialize app_loop as None
-        self.message_queue = asyncio.Queue()
+        self.message_queue = asyncio.Queue(maxsize=MESSAGE_QUEUE_SIZE)
+        self.dropped_msg_count = 0  # oldest queued messages discarded because the queue was full
+        # AIProcessingWorker jobs, started in order by _ai_consumer
+        self.ai_job_queue: asyncio.Queue = asyncio.Queue()
+        # Markup lines for #app-log from any thread; written in batches by _drain_log_queue
+        self._log_queue: queue.SimpleQueue = queue.SimpleQueue()
         
         # Initialize Meshtastic handler
         self.meshtastic_handler = MeshtasticHandler(
@@ -750,6 +853,7 @@ class MeshtasticInteractive(App):
         )
         
         # Get AI node ID
+        self._ai_node_num = self.meshtastic_handler.node_id  # node number ai_node_id was formatted from
         self.ai_node_id = self._norm_id(f"{self.meshtastic_handler.node_id:x}") if self.meshtastic_handler.node_id else None
         self.log_info(f"AI Node ID set to: '{self.ai_node_id}' (from meshtastic_handler.node_id: {self.meshtastic_handler.node_id})")
         
@@ -782,8 +886,8 @@ class MeshtasticInteractive(App):
                 self.matrix_bridge = None
 
         # Other initializations
-        self.url_pattern = re.compile(r'https?://[^\s/$.?#].[^\s]*', re.IGNORECASE)
-        self.last_response_times = {}
+        self.url_pattern = self.router.url_pattern  # one compiled URL matcher for the app
+        self.last_response_times = ReplyTimes()  # monotonic time of last reply per conversation
         self.tx_count = 0
         self.rx_count = 0
         self.active_channel_for_ai_posts = getattr(self.app_config, 'ACTIVE_MESHTASTIC_CHANNEL_INDEX', 0)
@@ -792,6 +896,7 @@ class MeshtasticInteractive(App):
         self.ai_max_delay = getattr(self.app_config, 'AI_MAX_RESPONSE_DELAY_S', 8)
         self.ai_cooldown = getattr(self.app_config, 'AI_RESPONSE_COOLDOWN_S', 60)
         self.enable_ai_triage = getattr(self.app_config, 'ENABLE_AI_TRIAGE_ON_CHANNELS', False)
+        self.debug_log = getattr(self.app_config, 'TUI_DEBUG_LOG', False)
         
         # State
         self.nodes: Dict[str, dict] = {}
@@ -804,29 +909,43 @@ class MeshtasticInteractive(App):
         self.unread_counts: Dict[str, int] = {}
         self.channel_unread: Dict[int, int] = {}  # {channel_id: count}
         self.node_unread: Dict[str, int] = {}  # {node_id: count}
+        self._total_unread = 0  # sum of both maps above, kept current by _set_unread()
+        self._node_items: List[NodeListItem] = []  # node list rows as last rendered
+        self._dirty_nodes: set = set()  # nodes changed by packets since the last list refresh
+        self._last_viewed_dirty = False  # last_viewed_messages changed since the last save
+        self._dm_conv_cache: Dict[str, str] = {}  # remote node id -> DM conversation id
+        self._dm_conv_owner = None  # ai_node_id the cache was built for
+        self._channel_items: List[ChannelListItem] = []  # channel list rows as last rendered
         
         # Load persisted last viewed state
         self.load_last_viewed_state()
     
     def log_info(self, message: str) -> None:
-        """Log info message to file and console"""
-        import logging
+        """Log info message to file and the app log panel (safe from any thread)"""
         logging.info(message)
-        try:
-            log_widget = self.query_one("#app-log", RichLog)
-            log_widget.write(f"[blue]{message}[/blue]")
-        except:
-            print(f"INFO: {message}")
+        self._log_queue.put_nowait(f"[blue]{message}[/blue]")
     
     def log_error(self, message: str) -> None:
-        """Log error message to file and console"""
-        import logging
+        """Log error message to file and the app log panel (safe from any thread)"""
         logging.error(message)
+        self._log_queue.put_nowait(f"[red]{message}[/red]")
+
+    def _drain_log_queue(self, max_lines: int = 200) -> None:
+        """Write queued log_info/log_error lines to #app-log in one call"""
+        lines = []
         try:
-            log_widget = self.query_one("#app-log", RichLog)
-            log_widget.write(f"[red]{message}[/red]")
-        except:
-            print(f"ERROR: {message}")
+            while len(lines) < max_lines:
+                lines.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
+            self._app_log.write("\n".join(lines))
+
+    def _flush_dirty_nodes(self) -> None:
+        """Refresh the node list once for all packet updates since the last tick"""
+        if self._dirty_nodes:
+            self._dirty_nodes.clear()
+            self.update_node_list()
     
     def compose(self) -> ComposeResult:
         """Create child widgets"""
@@ -980,14 +1099,27 @@ class MeshtasticInteractive(App):
     async def on_mount(self) -> None:
         """Called when the app is mounted"""
         self.app_loop = asyncio.get_running_loop()
+        # Widgets used on hot paths, looked up once instead of a DOM query per use
+        self._app_log = self.query_one("#app-log", RichLog)
+        self._node_list = self.query_one("#node-list", ListView)
+        self._message_display = self.query_one("#message-display", RichLog)
+        self._node_stats = self.query_one("#node-stats", NodeStatsPanel)
+        self._status_bar = self.query_one("#status-bar", InfoPanel)
+        self._message_input = self.query_one("#message-input", Input)
+        self._chat_header = self.query_one("#chat-header", Label)
+        self._channel_list = self.query_one("#channel-list", ListView)
         # Start message queue processor
         self.run_worker(self.process_message_queue, group="message_processor")
+        self.run_worker(self._ai_consumer, group="ai_proc")
+        self.set_interval(0.1, self._drain_log_queue)
+        self.set_interval(0.5, self._flush_dirty_nodes)
+        self.set_interval(2.0, self._flush_last_viewed_if_dirty)
 
         # Populate channel list from device
         self.update_channel_list()
 
-        # Load initial nodes
-        self.load_initial_nodes()
+        # Load initial nodes (the interface scan runs on a thread; the list fills in when done)
+        self.run_worker(self.load_initial_nodes(), group="node_loader")
 
         # Set default channel
         self.load_conversation()
@@ -996,22 +1128,31 @@ class MeshtasticInteractive(App):
         self.update_stats()
 
         # Log startup
-        self.query_one("#app-log", RichLog).write("[green]Eva Mesh AI started[/green]")
+        self._app_log.write("[green]Eva Mesh AI started[/green]")
 
         # Initial info panel update
         self.refresh_info_panel()
 
         # Focus the message input by default
-        self.query_one("#message-input").focus()
+        self._message_input.focus()
     
-    def load_initial_nodes(self) -> None:
+    async def load_initial_nodes(self) -> None:
         """Load nodes from Meshtastic interface"""
+        nodes = await asyncio.to_thread(self._scan_interface_nodes)
+        if nodes:
+            self.nodes.update(nodes)
+            self.update_node_list()
+
+    def _scan_interface_nodes(self) -> dict:
+        """Build detailed info for every node in the interface's node DB (runs off the event loop)"""
+        nodes = {}
         if self.meshtastic_handler and self.meshtastic_handler.interface:
             interface = self.meshtastic_handler.interface
             if hasattr(interface, 'nodes') and interface.nodes:
-                for node_id, node_info in interface.nodes.items():
+                now = time.time()
+                # Snapshot first: the reader thread may add nodes while we scan
+                for node_id, node_info in list(interface.nodes.items()):
                     if 'user' in node_info:
-                        user = node_info['user']
                         # Handle node_id format
                         if isinstance(node_id, str):
                             node_id_str = self._norm_id(node_id)
@@ -1019,50 +1160,48 @@ class MeshtasticInteractive(App):
                             node_id_str = self._norm_id(f"{node_id:x}")
                         
                         # Get detailed node information
-                        detailed_info = self._get_detailed_node_info(node_id_str, node_info)
-                        
-                        self.nodes[node_id_str] = detailed_info
-                
-                self.update_node_list()
+                        nodes[node_id_str] = self._get_detailed_node_info(node_id_str, node_info, now)
+        return nodes
     
-    def _get_detailed_node_info(self, node_id_str: str, node_info: dict) -> dict:
+    def _get_detailed_node_info(self, node_id_str: str, node_info: dict, now: float = None) -> dict:
         """Get detailed information about a node including signal history"""
-        user = node_info.get('user', {})
+        ni_get = node_info.get
+        u_get = ni_get('user', {}).get
+        if now is None:
+            now = time.time()
         
         # Basic info
         # Detect connection type: viaMqtt flag or hopsAway=-1 means MQTT
-        is_mqtt = node_info.get('viaMqtt', False)
-        if not is_mqtt and node_info.get('hopsAway') == -1:
-            is_mqtt = True
+        hops_away = ni_get('hopsAway')
+        is_mqtt = ni_get('viaMqtt', False) or hops_away == -1
+
+        # Signal information (0 is a valid SNR, so fall back only on None)
+        rssi = ni_get('rssi')
+        if rssi is None:
+            rssi = ni_get('lastPacketRssi')
+        snr = ni_get('snr')
+        if snr is None:
+            snr = ni_get('lastPacketSnr')
 
         detailed_info = {
-            'long_name': user.get('longName', 'Unknown'),
-            'short_name': user.get('shortName', 'UNK'),
-            'last_heard': node_info.get('lastHeard', time.time()),
-            'first_heard': node_info.get('firstHeard', time.time()),
-            'is_favorite': node_info.get('isFavorite', False),
-            'hops_away': node_info.get('hopsAway', None),
+            'long_name': u_get('longName', 'Unknown'),
+            'short_name': u_get('shortName', 'UNK'),
+            'last_heard': ni_get('lastHeard', now),
+            'first_heard': ni_get('firstHeard', now),
+            'is_favorite': ni_get('isFavorite', False),
+            'hops_away': hops_away,
             'connection_type': 'tcp' if is_mqtt else 'radio',
             'node_id': node_id_str,
-            'user_role': user.get('role', 'Unknown'),
-            'model': node_info.get('model', 'Unknown'),
-            'battery_level': node_info.get('batteryLevel'),
-            'uptime': node_info.get('uptime'),
+            'user_role': u_get('role', 'Unknown'),
+            'model': ni_get('model', 'Unknown'),
+            'battery_level': ni_get('batteryLevel'),
+            'uptime': ni_get('uptime'),
+            'rssi': rssi,
+            'snr': snr,
         }
         
-        # Signal information
-        rssi = node_info.get('rssi')
-        snr = node_info.get('snr')
-        if rssi is None and 'lastPacketRssi' in node_info:
-            rssi = node_info['lastPacketRssi']
-        if snr is None and 'lastPacketSnr' in node_info:
-            snr = node_info['lastPacketSnr']
-        
-        detailed_info['rssi'] = rssi
-        detailed_info['snr'] = snr
-        
         # GPS Position
-        position = node_info.get('position')
+        position = ni_get('position')
         if position:
             detailed_info['position'] = {
                 'latitude': position.get('latitude'),
@@ -1070,22 +1209,12 @@ class MeshtasticInteractive(App):
                 'altitude': position.get('altitude'),
             }
         
-        # Signal history (simulate last 4 packets - in real implementation this would track actual packets)
-        signal_history = []
-        current_time = time.time()
-        for i in range(4):
-            # Simulate signal history with slight variations
-            packet_time = current_time - (i * 60)  # Each packet 1 minute apart
-            packet_rssi = rssi + random.randint(-5, 5) if rssi is not None else None
-            packet_snr = snr + random.randint(-2, 2) if snr is not None else None
-            
-            signal_history.append({
-                'timestamp': packet_time,
-                'rssi': packet_rssi,
-                'snr': packet_snr,
-            })
-        
-        detailed_info['signal_history'] = signal_history
+        # Signal history starts with the node DB's last reading; _update_node_from_interface
+        # appends a real entry for every message heard afterwards
+        if rssi is not None or snr is not None:
+            detailed_info['signal_history'] = [{'timestamp': detailed_info['last_heard'], 'rssi': rssi, 'snr': snr}]
+        else:
+            detailed_info['signal_history'] = []
         
         return detailed_info
 
@@ -1094,8 +1223,7 @@ class MeshtasticInteractive(App):
         Sort order: MQTT/internet nodes first, then by last_heard (newest first), then by hops (closest first).
         Respects self.node_filter: 'all', 'radio', or 'mqtt'.
         """
-        node_list = self.query_one("#node-list", ListView)
-        node_list.clear()
+        node_list = self._node_list
 
         def sort_key(item):
             _nid, info = item
@@ -1122,23 +1250,44 @@ class MeshtasticInteractive(App):
         elif self.hop_filter == "3+":
             sorted_nodes = [(nid, info) for nid, info in sorted_nodes if (info.get('hops_away') or 0) >= 3]
 
+        rows = []
         for node_id, node_info in sorted_nodes:
             # Get DM conversation ID
             conv_id = self._dm_conv(node_id)
             # Get total messages in conversation
-            messages = self.conversation_manager.load_conversation(conv_id)
-            total_messages = len(messages)
+            total_messages = self.conversation_manager.message_count(conv_id)
             # Get last viewed count
             last_viewed = self.last_viewed_messages.get(conv_id, 0)
             # Calculate unread
             unread = max(0, total_messages - last_viewed)
-            self.node_unread[node_id] = unread
-            node_list.append(NodeListItem(node_id, node_info, node_info.get('is_favorite', False), unread))
+            self._set_unread(self.node_unread, node_id, unread)
+            NodeListItem.display_text(node_id, node_info)
+            rows.append((node_id, node_info, node_info.get('is_favorite', False), unread))
+
+        # Same nodes in the same order: update the existing items in place and only
+        # recompose those whose displayed fields changed
+        rendered = self._node_items
+        if len(rendered) == len(rows) and all(item.node_id == row[0] for item, row in zip(rendered, rows)):
+            for item, (node_id, node_info, is_favorite, unread) in zip(rendered, rows):
+                render_key = NodeListItem.render_key(node_info, is_favorite, unread)
+                if render_key != item.rendered_key:
+                    item.node_info, item.is_favorite, item.unread_count = node_info, is_favorite, unread
+                    item.refresh(recompose=True)
+            return
+
+        node_list.clear()
+        self._node_items = [NodeListItem(*row) for row in rows]
+        node_list.extend(self._node_items)
     
     def get_last_viewed_file_path(self) -> str:
         """Get the path to the last viewed state file"""
-        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "last_viewed.json")
+        return _LAST_VIEWED_PATH
     
+    def _flush_last_viewed_if_dirty(self) -> None:
+        """Write the last viewed state if it changed since the last write"""
+        if self._last_viewed_dirty:
+            self.save_last_viewed_state()
+
     def save_last_viewed_state(self) -> None:
         """Save the last viewed message counts to a file"""
         try:
@@ -1146,8 +1295,14 @@ class MeshtasticInteractive(App):
                 'last_viewed': self.last_viewed_messages,
                 'timestamp': time.time()
             }
-            with open(self.get_last_viewed_file_path(), 'w') as f:
-                json.dump(state, f)
+            if orjson is not None:
+                with open(self.get_last_viewed_file_path(), 'wb') as f:
+                    f.write(orjson.dumps(state))
+            else:
+                data = json.dumps(state, separators=(',', ':'))
+                with open(self.get_last_viewed_file_path(), 'w') as f:
+                    f.write(data)
+            self._last_viewed_dirty = False
         except Exception as e:
             # Since we might be shutting down, just print to stderr
             print(f"Failed to save last viewed state: {str(e)}", file=sys.stderr)
@@ -1157,9 +1312,13 @@ class MeshtasticInteractive(App):
         try:
             file_path = self.get_last_viewed_file_path()
             if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    state = json.load(f)
-                    self.last_viewed_messages = state.get('last_viewed', {})
+                if orjson is not None:
+                    with open(file_path, 'rb') as f:
+                        state = orjson.loads(f.read())
+                else:
+                    with open(file_path, 'r') as f:
+                        state = json.load(f)
+                self.last_viewed_messages = state.get('last_viewed', {})
         except Exception as e:
             # If there's an error loading, start fresh
             self.last_viewed_messages = {}
@@ -1171,32 +1330,45 @@ class MeshtasticInteractive(App):
         else:
             conv_id = self._dm_conv(self.current_chat_id)
 
-        messages = self.conversation_manager.load_conversation(conv_id)
+        # Only the displayed tail is parsed; the total comes from the cached count
+        messages = self.conversation_manager.load_tail(conv_id, DISPLAY_MESSAGES)
+        total_messages = self.conversation_manager.message_count(conv_id)
 
         # Update chat header
         bot_name = getattr(self.app_config, 'BOT_NAME', 'Eva')
         try:
-            header = self.query_one("#chat-header", Label)
+            header = self._chat_header
             if self.current_chat_type == "channel":
-                header.update(f" Ch {self.current_chat_id}  |  {len(messages)} msgs  |  {bot_name}")
+                header.update(f" Ch {self.current_chat_id}  |  {total_messages} msgs  |  {bot_name}")
             else:
                 node = self.nodes.get(self.current_chat_id, {})
                 name = node.get('long_name', self.current_chat_id)
-                header.update(f" DM  {name}  |  {len(messages)} msgs")
+                header.update(f" DM  {name}  |  {total_messages} msgs")
         except Exception:
             pass
 
-        message_display = self.query_one("#message-display", RichLog)
+        message_display = self._message_display
         message_display.clear()
 
+        lines = []
         if not messages:
-            message_display.write("[dim italic]No messages yet...[/dim italic]")
+            lines.append("[dim italic]No messages yet...[/dim italic]")
         else:
             prev_date = None
+            prev_minute = None
+            now = time.time()
+            # Only the tail is rendered; older messages stay in the conversation file
+            hidden = total_messages - len(messages)
+            if hidden > 0:
+                lines.append(f"[dim italic]... {hidden} earlier messages not shown[/dim italic]")
             for msg in messages:
-                ts = msg.get('timestamp', time.time())
-                msg_date = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
-                timestamp = datetime.fromtimestamp(ts).strftime("%H:%M")
+                # Messages in the same minute reuse the previous date/time strings
+                minute = int(msg.get('timestamp', now)) // 60
+                if minute != prev_minute:
+                    prev_minute = minute
+                    lt = time.localtime(minute * 60)
+                    msg_date = f"{lt.tm_year}-{lt.tm_mon:02d}-{lt.tm_mday:02d}"
+                    timestamp = f"{lt.tm_hour:02d}:{lt.tm_min:02d}"
                 sender = msg.get('user_name', 'Unknown')
                 node_id = msg.get('node_id', '')
                 content = msg.get('content', '')
@@ -1204,32 +1376,34 @@ class MeshtasticInteractive(App):
 
                 # Date separator
                 if msg_date != prev_date:
-                    message_display.write(f"[dim]{'':>10}--- {msg_date} ---[/dim]")
+                    lines.append(f"[dim]{'':>10}--- {msg_date} ---[/dim]")
                     prev_date = msg_date
 
                 # Style per role
                 if role == 'assistant':
-                    name_style = "bold #58a6ff"
+                    name_pre, name_post, msg_pre, msg_post = _MSG_STYLE_AI
                     sender = bot_name
-                    msg_style = "#58a6ff"
                     node_tag = ""
                 elif sender in ("You", "You (TUI)"):
-                    name_style = "bold #3fb950"
+                    name_pre, name_post, msg_pre, msg_post = _MSG_STYLE_YOU
                     sender = "You"
-                    msg_style = "#c9d1d9"
                     node_tag = ""
                 else:
-                    name_style = "bold #d2a8ff"
-                    msg_style = "#c9d1d9"
+                    name_pre, name_post, msg_pre, msg_post = _MSG_STYLE_OTHER
                     node_tag = f" [dim #6e7681](!{node_id})[/dim #6e7681]" if node_id else ""
 
-                message_display.write(
-                    f"[dim #484f58]{timestamp}[/dim #484f58] [{name_style}]{sender}[/{name_style}]{node_tag}  [{msg_style}]{content}[/{msg_style}]"
+                lines.append(
+                    f"[dim #484f58]{timestamp}[/dim #484f58] {name_pre}{sender}{name_post}{node_tag}  {msg_pre}{content}{msg_post}"
                 )
 
-        # Update last viewed count and persist
-        self.last_viewed_messages[conv_id] = len(messages)
-        self.save_last_viewed_state()
+        # One write for the whole view; lines are parsed separately so markup in a
+        # message cannot leak into the next one
+        rendered = Text("\n").join(Text.from_markup(line) for line in lines)
+        message_display.write(message_display.highlighter(rendered))
+
+        # Update last viewed count; written out by the periodic flush
+        self.last_viewed_messages[conv_id] = total_messages
+        self._last_viewed_dirty = True
 
         # Update sidebar counts
         self.update_channel_list()
@@ -1240,7 +1414,7 @@ class MeshtasticInteractive(App):
         message_display.scroll_end(animate=False)
 
         # Focus input
-        self.query_one("#message-input").focus()
+        self._message_input.focus()
     
     def update_stats(self) -> None:
         """Update info/status bar"""
@@ -1253,7 +1427,7 @@ class MeshtasticInteractive(App):
             self.current_chat_id = str(event.item.channel_id)
             self.load_conversation()
             self.update_stats()
-            log = self.query_one("#app-log", RichLog)
+            log = self._app_log
             log.write(f"[blue]Selected channel {event.item.channel_id}[/blue]")
         elif isinstance(event.item, NodeListItem):
             self.current_chat_type = "dm"
@@ -1262,7 +1436,7 @@ class MeshtasticInteractive(App):
             self.update_stats()
             
             # Update node statistics panel
-            node_stats_panel = self.query_one("#node-stats", NodeStatsPanel)
+            node_stats_panel = self._node_stats
             node_info = self.nodes.get(event.item.node_id, {})
             node_stats_panel.set_node(event.item.node_id, node_info)
             self.selected_node_id = event.item.node_id
@@ -1271,7 +1445,7 @@ class MeshtasticInteractive(App):
             if self.show_map:
                 self._refresh_map()
             
-            log = self.query_one("#app-log", RichLog)
+            log = self._app_log
             log.write(f"[magenta]Selected DM with {event.item.node_info['long_name']}[/magenta]")
     
     async def on_input_submitted(self, event: Input.Submitted) -> None:
@@ -1302,18 +1476,16 @@ class MeshtasticInteractive(App):
                 user_name="You",
                 node_id=self.ai_node_id
             )
-            # Update last viewed count since we just sent a message and persist it
-            self.last_viewed_messages[conv_id] = len(self.conversation_manager.load_conversation(conv_id))
-            self.save_last_viewed_state()
+            # load_conversation() marks the chat as read and persists that
             self.load_conversation()
-            log = self.query_one("#app-log", RichLog)
+            log = self._app_log
             log.write(f"[green]Message sent[/green]")
             
             # tx counter update
             self.tx_count += 1
             self.update_stats()
         else:
-            log = self.query_one("#app-log", RichLog)
+            log = self._app_log
             log.write(f"[red]Failed to send: {reason}[/red]")
     
     def handle_meshtastic_message(self, text, sender_id, sender_name, destination_id, channel_id):
@@ -1322,58 +1494,70 @@ class MeshtasticInteractive(App):
             # Update AI node ID to ensure it's current
             self._update_ai_node_id()
             
+            data = InboundMessage(text, self._norm_id(sender_id), sender_name,
+                                  self._norm_id(destination_id), channel_id)
             # Queue for async processing
             if self.app_loop is None:
                 # If app_loop is not ready, store message in queue
-                self.message_queue.put_nowait({
-                    'text': text,
-                    'sender_id': self._norm_id(sender_id),
-                    'sender_name': sender_name,
-                    'destination_id': self._norm_id(destination_id),
-                    'channel_id': channel_id
-                })
+                self._enqueue_message(data)
             else:
-                # If app_loop is ready, use it to queue the message
-                asyncio.run_coroutine_threadsafe(
-                    self.message_queue.put({
-                        'text': text,
-                        'sender_id': self._norm_id(sender_id),
-                        'sender_name': sender_name,
-                        'destination_id': self._norm_id(destination_id),
-                        'channel_id': channel_id
-                    }),
-                    self.app_loop
-                )
+                # If app_loop is ready, hand the put to it (no coroutine/Future needed)
+                self.app_loop.call_soon_threadsafe(self._enqueue_message, data)
         except Exception as e:
             log_error(f"Error in handle_meshtastic_message: {e}")
             traceback.print_exc()
     
+    async def _ai_consumer(self) -> None:
+        """Start queued AI jobs in order, at most MAX_CONCURRENT_AI running at once"""
+        slots = asyncio.Semaphore(MAX_CONCURRENT_AI)
+        running = set()  # strong refs until each task finishes
+
+        async def run_job(job: AIProcessingWorker) -> None:
+            try:
+                await job.run_async()
+            finally:
+                slots.release()
+
+        while True:
+            job = await self.ai_job_queue.get()
+            await slots.acquire()
+            task = asyncio.create_task(run_job(job))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+    def _enqueue_message(self, data: InboundMessage) -> None:
+        """Queue an inbound message, discarding the oldest one when the queue is full"""
+        try:
+            self.message_queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.message_queue.get_nowait()
+            self.message_queue.put_nowait(data)
+            self.dropped_msg_count += 1
+            logger.warning("Inbound message queue full, dropped oldest message (%d total)", self.dropped_msg_count)
+
     async def process_message_queue(self) -> None:
         """Process queued messages"""
         while True:
             try:
-                if not self.message_queue.empty():
-                    data = await self.message_queue.get()
-                    await self.process_incoming_message(data)
-                await asyncio.sleep(0.1)  # Small delay to prevent CPU spinning
+                # Blocks until a message arrives; no polling
+                data = await self.message_queue.get()
+                await self.process_incoming_message(data)
             except Exception as e:
                 log_error(f"Error in process_message_queue: {e}")
                 traceback.print_exc()
                 await asyncio.sleep(1)  # Longer delay on error
     
-    async def process_incoming_message(self, data: dict) -> None:
+    async def process_incoming_message(self, data: "InboundMessage") -> None:
         """Process an incoming message via the central MessageRouter."""
         try:
-            log_widget = self.query_one("#app-log", RichLog)
-
-            text = data['text']
-            sender_id = self._norm_id(data['sender_id'])
-            sender_name = data['sender_name']
-            destination_id = self._norm_id(data['destination_id'])
-            channel_id = data['channel_id']
+            log_widget = self._app_log
 
-            # Update AI node ID
-            self._update_ai_node_id()
+            # IDs were normalized by handle_meshtastic_message before queueing
+            text = data.text
+            sender_id = data.sender_id
+            sender_name = data.sender_name
+            destination_id = data.destination_id
+            channel_id = data.channel_id
 
             # --- Route via centralised router ---
             result = self.router.on_message(
@@ -1393,8 +1577,10 @@ class MeshtasticInteractive(App):
             if conv_id == current_conv_id:
                 self.load_conversation()
             else:
-                self.update_channel_list()
-                self.update_node_list()
+                # Only the row this message landed in changes; DMs don't touch channels
+                if conv_id.startswith("ch_"):
+                    self._bump_channel_unread(eff_ch)
+                self._dirty_nodes.add(sender_id)
                 self.refresh_info_panel()
 
             log_widget.write(f"[yellow]MSG from {sender_name}: {text[:50].strip()}[/yellow]")
@@ -1451,14 +1637,15 @@ class MeshtasticInteractive(App):
 
             # --- AI response needed: spawn worker ---
             if result.needs_ai_response:
-                log_widget.write(f"[bright_green]Starting AI worker for {sender_name} (conv={conv_id})[/bright_green]")
+                if self.debug_log:
+                    log_widget.write(f"[bright_green]Starting AI worker for {sender_name} (conv={conv_id})[/bright_green]")
                 processor = AIProcessingWorker(
                     self, text, sender_id, sender_name, eff_ch,
                     result.reply_as_dm, conv_id, self.router.url_pattern,
                     skip_triage=result.skip_triage
                 )
-                self.run_worker(processor.run, exclusive=True, group="ai_proc", thread=True)
-            else:
+                self.ai_job_queue.put_nowait(processor)
+            elif self.debug_log:
                 log_widget.write(f"[bright_red]AI will NOT respond to this message[/bright_red]")
 
         except Exception as e:
@@ -1469,70 +1656,29 @@ class MeshtasticInteractive(App):
         """Get conversation ID for a DM with another node"""
         if not self.ai_node_id:
             return f"dm_{remote_id}"
-        # Sort IDs to ensure consistent conversation ID regardless of who initiated
-        return f"dm_{'_'.join(sorted([self._norm_id(remote_id), self.ai_node_id]))}"
+        if self._dm_conv_owner != self.ai_node_id:
+            # Cached ids embed the AI node id; start over when it changes
+            self._dm_conv_cache.clear()
+            self._dm_conv_owner = self.ai_node_id
+        conv_id = self._dm_conv_cache.get(remote_id)
+        if conv_id is None:
+            # Sort IDs to ensure consistent conversation ID regardless of who initiated
+            conv_id = self._dm_conv_cache[remote_id] = f"dm_{'_'.join(sorted([self._norm_id(remote_id), self.ai_node_id]))}"
+        return conv_id
 
     def _norm_id(self, s: str) -> str:
         """Normalize node ID format"""
         return s.lstrip('!').lower() if isinstance(s, str) else str(s)
 
-    def handle_ai_response(self, text, sender_id, sender_name, channel_id, is_dm, conv_id):
-        """Handle AI response generation"""
-        # Check cooldown
-        now = time.time()
-        if self.ai_cooldown > 0:
-            last_response_time = self.last_response_times.get(conv_id, 0)
-            if (now - last_response_time) < self.ai_cooldown:
-                return
-        
-        # Check probability
-        if random.random() > self.ai_response_probability:
-            return
-        
-        try:
-            # Get context
-            context_history = self.conversation_manager.get_contextual_history(conv_id, for_user_name=sender_name)
-            
-            # Get AI response
-            ai_response = self.ai_bridge.get_response(context_history, text, sender_name, sender_id, skip_triage=is_dm)
-            
-            if ai_response:
-                # Apply delay
-                if self.ai_min_delay >= 0 and self.ai_max_delay > self.ai_min_delay:
-                    delay = random.uniform(self.ai_min_delay, self.ai_max_delay)
-                    time.sleep(delay)
-                
-                # Save to conversation
-                self.conversation_manager.add_message(conv_id, "assistant", ai_response)
-                self.last_response_times[conv_id] = time.time()
-                
-                # Send message
-                if is_dm:
-                    success, reason = self.meshtastic_handler.send_message(
-                        ai_response, destination_id_hex=sender_id, channel_index=channel_id
-                    )
-                else:
-                    success, reason = self.meshtastic_handler.send_message(
-                        ai_response, channel_index=channel_id
-                    )
-                
-                # Update UI
-                asyncio.run_coroutine_threadsafe(
-                    self.update_after_ai_response(conv_id, success, reason, sender_name),
-                    self.app_loop or asyncio.get_running_loop()
-                )
-        except Exception as e:
-            pass
-    
-    async def update_after_ai_response(self, conv_id: str, success: bool, reason: str, sender_name: str) -> None:
-        """Update UI after AI response"""
+    def _apply_ai_response_ui(self, conv_id: str, success: bool, reason: str, sender_name: str) -> None:
+        """Update UI after AI response (runs on the app loop)"""
         # Reload conversation if current
         current_conv_id = f"ch_{self.current_chat_id}_broadcast" if self.current_chat_type == "channel" else self._dm_conv(self.current_chat_id)
         if conv_id == current_conv_id:
             self.load_conversation()
         
         # Log result
-        log = self.query_one("#app-log", RichLog)
+        log = self._app_log
         if success:
             log.write(f"[cyan]AI replied to {sender_name}[/cyan]")
             
@@ -1543,26 +1689,24 @@ class MeshtasticInteractive(App):
     
     def action_focus_channel_list(self) -> None:
         """Focus the channel list"""
-        self.query_one("#channel-list").focus()
+        self._channel_list.focus()
     
     def action_focus_node_list(self) -> None:
         """Focus the node list"""
-        self.query_one("#node-list").focus()
+        self._node_list.focus()
     
     def action_focus_messages(self) -> None:
         """Focus the message display"""
-        self.query_one("#message-display").focus()
+        self._message_display.focus()
 
     def action_focus_input(self) -> None:
         """Focus the message input"""
-        self.query_one("#message-input").focus()
+        self._message_input.focus()
 
     def refresh_info_panel(self):
         """Update the compact status bar in sidebar."""
         try:
-            total_channel_unread = sum(self.channel_unread.values())
-            total_node_unread = sum(self.node_unread.values())
-            total_unread = total_channel_unread + total_node_unread
+            total_unread = self._total_unread
             connected = self.meshtastic_handler.is_connected if self.meshtastic_handler else False
 
             info_stats = {
@@ -1570,14 +1714,32 @@ class MeshtasticInteractive(App):
                 "Nodes": len(self.nodes),
                 "Unread": total_unread,
             }
-            self.query_one("#status-bar", InfoPanel).set_stats(info_stats)
+            if self.dropped_msg_count:
+                info_stats["Dropped"] = self.dropped_msg_count
+            self._status_bar.set_stats(info_stats)
         except Exception:
             pass
 
+    def _set_unread(self, counts: dict, key, unread: int) -> None:
+        """Store one unread count and keep the running total in step"""
+        self._total_unread += unread - counts.get(key, 0)
+        counts[key] = unread
+
+    def _bump_channel_unread(self, ch_id: int) -> None:
+        """Refresh the unread badge of one channel row; rebuild the list if it isn't shown"""
+        for item in self._channel_items:
+            if item.channel_id == ch_id:
+                conv_id = f"ch_{ch_id}_broadcast"
+                unread = max(0, self.conversation_manager.message_count(conv_id) - self.last_viewed_messages.get(conv_id, 0))
+                self._set_unread(self.channel_unread, ch_id, unread)
+                item.set_row(item.channel_name, unread)
+                return
+        self.update_channel_list()
+
     def update_channel_list(self) -> None:
         """Update the channel list from device info with unread counts"""
-        channel_list = self.query_one("#channel-list", ListView)
-        channel_list.clear()
+        channel_list = self._channel_list
+        rows = []
 
         # Get actual channels from device
         device_channels = self.meshtastic_handler.list_channels() if self.meshtastic_handler else []
@@ -1587,31 +1749,45 @@ class MeshtasticInteractive(App):
                 ch_id = ch['index']
                 ch_name = ch['name'] if ch['name'] not in ('', f'Ch-{ch_id}', f'Secondary-{ch_id}') else f"Ch {ch_id}"
                 conv_id = f"ch_{ch_id}_broadcast"
-                messages = self.conversation_manager.load_conversation(conv_id)
-                total_messages = len(messages)
+                total_messages = self.conversation_manager.message_count(conv_id)
                 last_viewed = self.last_viewed_messages.get(conv_id, 0)
                 unread = max(0, total_messages - last_viewed)
-                self.channel_unread[ch_id] = unread
-                channel_list.append(ChannelListItem(ch_id, ch_name, unread))
+                self._set_unread(self.channel_unread, ch_id, unread)
+                rows.append((ch_id, ch_name, unread))
         else:
             # Fallback: show 8 channels
             for channel_id in range(8):
                 channel_name = "Primary" if channel_id == 0 else f"Ch {channel_id}"
                 conv_id = f"ch_{channel_id}_broadcast"
-                messages = self.conversation_manager.load_conversation(conv_id)
-                total_messages = len(messages)
+                total_messages = self.conversation_manager.message_count(conv_id)
                 last_viewed = self.last_viewed_messages.get(conv_id, 0)
                 unread = max(0, total_messages - last_viewed)
-                self.channel_unread[channel_id] = unread
-                channel_list.append(ChannelListItem(channel_id, channel_name, unread))
+                self._set_unread(self.channel_unread, channel_id, unread)
+                rows.append((channel_id, channel_name, unread))
+
+        # Same channels as shown: relabel the existing rows in place
+        rendered = self._channel_items
+        if len(rendered) == len(rows) and all(item.channel_id == row[0] for item, row in zip(rendered, rows)):
+            for item, (_ch_id, ch_name, unread) in zip(rendered, rows):
+                item.set_row(ch_name, unread)
+            return
+
+        # One mount for all rows instead of one per append()
+        channel_list.clear()
+        self._channel_items = [ChannelListItem(*row) for row in rows]
+        channel_list.extend(self._channel_items)
 
     async def on_unmount(self, event: events.Unmount) -> None:
         """Called when app is unmounting"""
         # Save state before closing
         self.save_last_viewed_state()
+        # Stop HAL bot background collector
+        self.hal_bot.close()
         # Close Meshtastic handler
         if self.meshtastic_handler:
             self.meshtastic_handler.close()
+        # Write any buffered conversation messages
+        self.conversation_manager.flush()
         # No need to call super() as we're handling the event directly
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
@@ -1626,7 +1802,7 @@ class MeshtasticInteractive(App):
     async def force_ai_response(self) -> None:
         """Force AI to respond to recent messages"""
         if not self.current_chat_id:
-            self.query_one("#app-log", RichLog).write("[orange3]Cannot force AI response: No active chat.[/orange3]")
+            self._app_log.write("[orange3]Cannot force AI response: No active chat.[/orange3]")
             return
         
         # Determine conversation ID
@@ -1635,15 +1811,13 @@ class MeshtasticInteractive(App):
         else: # DM
             conv_id = self._dm_conv(self.current_chat_id)
         
-        history = self.conversation_manager.load_conversation(conv_id)
-        if not history:
+        # Only the last 4 messages are used; don't parse the rest of the file
+        recent_messages = self.conversation_manager.load_tail(conv_id, 4)
+        if not recent_messages:
             # It's possible to force a reply in an empty chat, so create a minimal context
-            self.query_one("#app-log", RichLog).write("[grey53]Forcing AI response in empty chat.[/grey53]")
+            self._app_log.write("[grey53]Forcing AI response in empty chat.[/grey53]")
             # No history, AI will respond based on the prompt alone
         
-        # Get the last 3-4 messages if history exists
-        recent_messages = history[-4:] if history and len(history) >= 4 else (history if history else [])
-        
         # Create a context from recent messages
         context_str = "\n".join([
             f"{msg.get('user_name', 'Unknown')}: {msg.get('content', '')}"
@@ -1664,7 +1838,7 @@ class MeshtasticInteractive(App):
 
         # Log the details before starting worker
         log_msg = f"Forcing AI response. DM: {is_current_chat_dm}, Target: {target_node_id_for_worker}, Conv: {conv_id}"
-        self.query_one("#app-log", RichLog).write(f"[grey53]{log_msg}[/grey53]")
+        self._app_log.write(f"[grey53]{log_msg}[/grey53]")
 
         processor = AIProcessingWorker(
             self, # app instance
@@ -1678,12 +1852,7 @@ class MeshtasticInteractive(App):
             skip_triage=True  # Skip triage for forced responses
         )
         
-        self.run_worker(
-            processor.run, 
-            exclusive=True,
-            group="ai_proc",
-            thread=True
-        )
+        self.ai_job_queue.put_nowait(processor)
 
     def _update_node_info_from_message(self, sender_id: str, sender_name: str, channel_id: int) -> None:
         """Update node information when a message is received"""
@@ -1711,7 +1880,16 @@ class MeshtasticInteractive(App):
         # Try to get enhanced info from meshtastic interface
         if self.meshtastic_handler and self.meshtastic_handler.interface:
             interface = self.meshtastic_handler.interface
-            if hasattr(interface, 'nodes') and interface.nodes:
+            nodes_by_num = getattr(interface, 'nodesByNum', None)
+            if nodes_by_num is not None:
+                # Direct lookup by node number instead of scanning the whole node DB
+                try:
+                    node_info = nodes_by_num.get(int(sender_id, 16))
+                except ValueError:
+                    node_info = None
+                if node_info:
+                    self._update_node_from_interface(sender_id, node_info)
+            elif hasattr(interface, 'nodes') and interface.nodes:
                 # Find the node in the interface by numeric ID
                 for node_num, node_info in interface.nodes.items():
                     node_id_str = self._norm_id(f"{node_num:x}") if isinstance(node_num, int) else self._norm_id(node_num)
@@ -1772,37 +1950,43 @@ class MeshtasticInteractive(App):
             'snr': snr,
         }
         
-        signal_history = self.nodes[node_id].get('signal_history', [])
+        signal_history = self.nodes[node_id].setdefault('signal_history', [])
         signal_history.append(new_packet)
         
-        # Keep only last 10 packets
-        if len(signal_history) > 10:
-            signal_history = signal_history[-10:]
-        
-        self.nodes[node_id]['signal_history'] = signal_history
+        # Keep only last 10 packets (trimmed in place)
+        del signal_history[:-10]
 
     def _update_ai_node_id(self):
         """Update AI node ID from meshtastic handler"""
         if self.meshtastic_handler and self.meshtastic_handler.node_id:
+            if self.meshtastic_handler.node_id == self._ai_node_num:
+                return  # unchanged, skip re-formatting
+            self._ai_node_num = self.meshtastic_handler.node_id
             old_ai_node_id = self.ai_node_id
             self.ai_node_id = self._norm_id(f"{self.meshtastic_handler.node_id:x}")
             if old_ai_node_id != self.ai_node_id:
                 self.log_info(f"AI Node ID updated from '{old_ai_node_id}' to '{self.ai_node_id}'")
         else:
+            self._ai_node_num = None
             self.ai_node_id = None
 
 def main():
     """Main entry point"""
-    # Set up logging to file
-    import logging
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s %(levelname)s: %(message)s',
-        handlers=[
-            logging.FileHandler('interactive.backend.log', mode='a'),
-            logging.StreamHandler()
-        ]
-    )
+    # Set up logging to file; records are handed to a listener thread so the
+    # file/stream writes stay off the UI loop and the AI workers
+    file_handler = logging.FileHandler('interactive.backend.log', mode='a')
+    stream_handler = logging.StreamHandler()
+    formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s')
+    file_handler.setFormatter(formatter)
+    stream_handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    # Replace whatever is installed already (imports or main_app may have configured the root logger)
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.DEBUG)
     logging.info("Starting interactive application")
     
     app = MeshtasticInteractive()